@@ -0,0 +1,42 @@
+"""add booking daily stats table
+
+Revision ID: 3f9a6c2d1b7e
+Revises: b5287c9ea9dc
+Create Date: 2026-10-17 10:12:04.318220
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a6c2d1b7e'
+down_revision: Union[str, Sequence[str], None] = 'b5287c9ea9dc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('booking_daily_stats',
+    sa.Column('company_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('tour_package_id', sa.Integer(), nullable=False),
+    sa.Column('booking_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('pending_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('pax', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('total_amount', sa.Numeric(precision=14, scale=2), server_default='0', nullable=False),
+    sa.Column('advance_amount', sa.Numeric(precision=14, scale=2), server_default='0', nullable=False),
+    sa.Column('remaining_amount', sa.Numeric(precision=14, scale=2), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['tour_package_id'], ['tour_packages.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('company_id', 'day', 'tour_package_id')
+    )
+    # backfill from history: python -m app.seeds.rebuild_booking_daily_stats
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('booking_daily_stats')
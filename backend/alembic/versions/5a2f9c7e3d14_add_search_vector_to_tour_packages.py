@@ -0,0 +1,50 @@
+"""add search vector to tour packages
+
+Revision ID: 5a2f9c7e3d14
+Revises: e7b3a1f05c28
+Create Date: 2026-10-17 18:05:37.842116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a2f9c7e3d14'
+down_revision: Union[str, Sequence[str], None] = 'e7b3a1f05c28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'tour_packages',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(city, '')), 'B') || "
+                "setweight(to_tsvector('english', coalesce(country, '')), 'B') || "
+                "setweight(to_tsvector('english', coalesce(description, '')), 'C')",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tour_packages_search_vector "
+            "ON tour_packages USING gin (search_vector)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tour_packages_search_vector', table_name='tour_packages')
+    op.drop_column('tour_packages', 'search_vector')
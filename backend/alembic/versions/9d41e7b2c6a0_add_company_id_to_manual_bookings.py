@@ -0,0 +1,127 @@
+"""add company_id to manual bookings
+
+Revision ID: 9d41e7b2c6a0
+Revises: 3f9a6c2d1b7e
+Create Date: 2026-10-17 11:02:47.905113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d41e7b2c6a0'
+down_revision: Union[str, Sequence[str], None] = '3f9a6c2d1b7e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 10000
+
+# company_id for rows inserted without one, from their tour package
+FILL_COMPANY_ID_FUNCTION = """
+CREATE OR REPLACE FUNCTION manual_bookings_fill_company_id() RETURNS trigger AS $$
+BEGIN
+    IF NEW.company_id IS NULL THEN
+        SELECT company_id INTO NEW.company_id FROM tour_packages WHERE id = NEW.tour_package_id;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Safe to run against a live table and to re-run after an interruption:
+    every step is idempotent, the backfill commits per id batch and only
+    touches rows still missing company_id, and the indexes are built
+    CONCURRENTLY outside the migration transaction.
+
+    Rows inserted while it runs (or later, by app instances that predate
+    company_id) get it from a BEFORE INSERT trigger, created before the
+    backfill; a last catch-up UPDATE then leaves no NULLs to fail the
+    NOT NULL validation.
+    """
+    conn = op.get_bind()
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "ALTER TABLE manual_bookings "
+            "ADD COLUMN IF NOT EXISTS company_id INTEGER REFERENCES companies (id)"
+        )
+
+        # CREATE TRIGGER waits for in-flight inserts, so every row without
+        # company_id from here on is one the backfill below can see
+        op.execute(FILL_COMPANY_ID_FUNCTION)
+        op.execute("DROP TRIGGER IF EXISTS manual_bookings_fill_company_id ON manual_bookings")
+        op.execute(
+            "CREATE TRIGGER manual_bookings_fill_company_id "
+            "BEFORE INSERT ON manual_bookings "
+            "FOR EACH ROW EXECUTE FUNCTION manual_bookings_fill_company_id()"
+        )
+
+        start = conn.execute(sa.text(
+            "SELECT min(id) FROM manual_bookings WHERE company_id IS NULL"
+        )).scalar()
+        last = conn.execute(sa.text("SELECT max(id) FROM manual_bookings")).scalar()
+
+        while start is not None and start <= last:
+            conn.execute(
+                sa.text(
+                    "UPDATE manual_bookings AS mb "
+                    "SET company_id = tp.company_id "
+                    "FROM tour_packages AS tp "
+                    "WHERE tp.id = mb.tour_package_id "
+                    "AND mb.company_id IS NULL "
+                    "AND mb.id >= :start AND mb.id < :stop"
+                ),
+                {"start": start, "stop": start + BATCH_SIZE},
+            )
+            start += BATCH_SIZE
+
+        # catch-up over whatever is still NULL (rows of an interrupted
+        # earlier run included), so the validation below finds none
+        conn.execute(sa.text(
+            "UPDATE manual_bookings AS mb "
+            "SET company_id = tp.company_id "
+            "FROM tour_packages AS tp "
+            "WHERE tp.id = mb.tour_package_id AND mb.company_id IS NULL"
+        ))
+
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_manual_bookings_company_travel_date "
+            "ON manual_bookings (company_id, travel_date)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_manual_bookings_company_created_at "
+            "ON manual_bookings (company_id, created_at)"
+        )
+
+        # NOT NULL without a long exclusive lock: a validated CHECK lets
+        # SET NOT NULL skip its own full-table scan (PostgreSQL 12+)
+        op.execute(
+            "ALTER TABLE manual_bookings DROP CONSTRAINT IF EXISTS manual_bookings_company_id_not_null"
+        )
+        op.execute(
+            "ALTER TABLE manual_bookings ADD CONSTRAINT manual_bookings_company_id_not_null "
+            "CHECK (company_id IS NOT NULL) NOT VALID"
+        )
+        op.execute(
+            "ALTER TABLE manual_bookings VALIDATE CONSTRAINT manual_bookings_company_id_not_null"
+        )
+        op.execute("ALTER TABLE manual_bookings ALTER COLUMN company_id SET NOT NULL")
+        op.execute(
+            "ALTER TABLE manual_bookings DROP CONSTRAINT manual_bookings_company_id_not_null"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS manual_bookings_fill_company_id ON manual_bookings")
+    op.execute("DROP FUNCTION IF EXISTS manual_bookings_fill_company_id()")
+    op.drop_index('ix_manual_bookings_company_created_at', table_name='manual_bookings')
+    op.drop_index('ix_manual_bookings_company_travel_date', table_name='manual_bookings')
+    op.drop_column('manual_bookings', 'company_id')
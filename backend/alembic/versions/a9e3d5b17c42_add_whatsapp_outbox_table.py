@@ -0,0 +1,52 @@
+"""add whatsapp outbox table
+
+Revision ID: a9e3d5b17c42
+Revises: f6a1c8d3b250
+Create Date: 2026-10-17 23:41:27.905114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9e3d5b17c42'
+down_revision: Union[str, Sequence[str], None] = 'f6a1c8d3b250'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('whatsapp_outbox',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('company_id', sa.Integer(), nullable=False),
+    sa.Column('booking_id', sa.Integer(), nullable=True),
+    sa.Column('template', sa.String(length=100), nullable=False),
+    sa.Column('to_phone', sa.String(length=30), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('status', sa.String(length=20), server_default='pending', nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('provider_message_id', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['booking_id'], ['manual_bookings.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_whatsapp_outbox_booking_id'), 'whatsapp_outbox', ['booking_id'], unique=False)
+    op.create_index(op.f('ix_whatsapp_outbox_company_id'), 'whatsapp_outbox', ['company_id'], unique=False)
+    op.create_index('ix_whatsapp_outbox_due', 'whatsapp_outbox', ['next_attempt_at'], unique=False, postgresql_where=sa.text("status IN ('pending', 'sending')"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_whatsapp_outbox_due', table_name='whatsapp_outbox', postgresql_where=sa.text("status IN ('pending', 'sending')"))
+    op.drop_index(op.f('ix_whatsapp_outbox_company_id'), table_name='whatsapp_outbox')
+    op.drop_index(op.f('ix_whatsapp_outbox_booking_id'), table_name='whatsapp_outbox')
+    op.drop_table('whatsapp_outbox')
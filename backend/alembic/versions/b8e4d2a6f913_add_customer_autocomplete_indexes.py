@@ -0,0 +1,64 @@
+"""add customer autocomplete indexes
+
+Revision ID: b8e4d2a6f913
+Revises: 5a2f9c7e3d14
+Create Date: 2026-10-17 19:22:10.614389
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e4d2a6f913'
+down_revision: Union[str, Sequence[str], None] = '5a2f9c7e3d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+
+    op.add_column(
+        'customers',
+        sa.Column(
+            'phone_digits',
+            sa.String(length=30),
+            sa.Computed(
+                "regexp_replace(country_code || phone, '[^0-9]', '', 'g')",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_customers_company_guest_name_trgm "
+            "ON customers USING gin (company_id, guest_name gin_trgm_ops)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_customers_company_email_trgm "
+            "ON customers USING gin (company_id, email gin_trgm_ops)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_customers_company_phone_digits "
+            "ON customers (company_id, phone_digits varchar_pattern_ops)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_customers_company_phone "
+            "ON customers (company_id, phone varchar_pattern_ops)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_customers_company_phone', table_name='customers')
+    op.drop_index('ix_customers_company_phone_digits', table_name='customers')
+    op.drop_index('ix_customers_company_email_trgm', table_name='customers')
+    op.drop_index('ix_customers_company_guest_name_trgm', table_name='customers')
+    op.drop_column('customers', 'phone_digits')
@@ -0,0 +1,56 @@
+"""add driver day unique index
+
+Revision ID: c41d8e5f7a92
+Revises: 9d41e7b2c6a0
+Create Date: 2026-10-17 14:26:03.518207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d8e5f7a92'
+down_revision: Union[str, Sequence[str], None] = '9d41e7b2c6a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Existing double bookings would make the unique index build fail, so
+    they are reported up front and must be resolved by hand first.
+    """
+    conn = op.get_bind()
+
+    duplicates = conn.execute(sa.text(
+        "SELECT driver_id, travel_date, array_agg(id ORDER BY id) "
+        "FROM manual_bookings "
+        "WHERE driver_id IS NOT NULL AND NOT is_deleted "
+        "GROUP BY driver_id, travel_date "
+        "HAVING count(*) > 1"
+    )).fetchall()
+
+    if duplicates:
+        details = "; ".join(
+            f"driver {driver_id} on {travel_date}: bookings {ids}"
+            for driver_id, travel_date, ids in duplicates
+        )
+        raise RuntimeError(
+            "Drivers are double-booked, reassign or delete these bookings "
+            f"before upgrading: {details}"
+        )
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_manual_bookings_driver_travel_date "
+            "ON manual_bookings (driver_id, travel_date) WHERE NOT is_deleted"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_manual_bookings_driver_travel_date', table_name='manual_bookings')
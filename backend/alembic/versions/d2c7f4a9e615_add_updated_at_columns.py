@@ -0,0 +1,53 @@
+"""add updated_at columns
+
+Revision ID: d2c7f4a9e615
+Revises: b8e4d2a6f913
+Create Date: 2026-10-17 21:08:43.271905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2c7f4a9e615'
+down_revision: Union[str, Sequence[str], None] = 'b8e4d2a6f913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('tour_packages', 'manual_bookings', 'drivers', 'customers')
+
+# (company_id, updated_at) keeps count / max(updated_at) per company cheap
+INDEXED_TABLES = ('manual_bookings', 'drivers', 'customers')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # now() is evaluated once for the ALTER, so existing rows are not rewritten
+    for table in TABLES:
+        op.add_column(
+            table,
+            sa.Column(
+                'updated_at',
+                sa.DateTime(timezone=True),
+                server_default=sa.text('now()'),
+                nullable=False,
+            ),
+        )
+
+    with op.get_context().autocommit_block():
+        for table in INDEXED_TABLES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_company_updated_at "
+                f"ON {table} (company_id, updated_at)"
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in reversed(INDEXED_TABLES):
+        op.drop_index(f'ix_{table}_company_updated_at', table_name=table)
+    for table in reversed(TABLES):
+        op.drop_column(table, 'updated_at')
@@ -0,0 +1,41 @@
+"""add cover image path to tour packages
+
+Revision ID: e7b3a1f05c28
+Revises: c41d8e5f7a92
+Create Date: 2026-10-17 16:48:21.370554
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3a1f05c28'
+down_revision: Union[str, Sequence[str], None] = 'c41d8e5f7a92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tour_packages', sa.Column('cover_image_path', sa.String(length=255), nullable=True))
+
+    # latest cover image of each package
+    op.execute(
+        "UPDATE tour_packages AS tp "
+        "SET cover_image_path = cover.image_path "
+        "FROM ("
+        "  SELECT DISTINCT ON (tour_package_id) tour_package_id, image_path "
+        "  FROM tour_package_gallery_images "
+        "  WHERE image_type = 'cover' "
+        "  ORDER BY tour_package_id, id DESC"
+        ") AS cover "
+        "WHERE cover.tour_package_id = tp.id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tour_packages', 'cover_image_path')
@@ -0,0 +1,32 @@
+"""add image variants
+
+Revision ID: f6a1c8d3b250
+Revises: d2c7f4a9e615
+Create Date: 2026-10-17 22:14:05.518362
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a1c8d3b250'
+down_revision: Union[str, Sequence[str], None] = 'd2c7f4a9e615'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # existing uploads: python -m app.seeds.build_image_variants
+    op.add_column('tour_package_gallery_images', sa.Column('variants', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.add_column('tour_packages', sa.Column('cover_image_variants', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tour_packages', 'cover_image_variants')
+    op.drop_column('tour_package_gallery_images', 'variants')
@@ -15,6 +15,7 @@ from jose import jwt, JWTError
 from app.database.session import get_db
 from app.models.user import User
 from app.core.security import SECRET_KEY, ALGORITHM
+from app.auth.principal_cache import load_principal
 
 
 def redirect_to_login(request: Request, message: str):
@@ -52,7 +53,9 @@ def get_current_user(
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = db.query(User).filter(User.id == user_id).first()
+    # Principal (id, role, company id / status / currency), not the User
+    # row; cache hits need no query
+    user = load_principal(db, user_id)
 
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
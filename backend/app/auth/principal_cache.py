@@ -0,0 +1,123 @@
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy.orm import Session
+
+from app.models.company import Company
+from app.models.user import User
+
+# Per process: invalidation only reaches the worker that made the change,
+# the TTL bounds how long other workers keep an old role / status.
+PRINCIPAL_CACHE_TTL = 60
+PRINCIPAL_CACHE_SIZE = 2048
+
+
+class CompanyPrincipal:
+    """
+    The company fields routes read from current_user.company. Load the
+    Company row when more is needed (or to change it).
+    """
+
+    __slots__ = ("id", "status", "currency")
+
+    def __init__(self, id: int, status: str, currency: str):
+        self.id = id
+        self.status = status
+        self.currency = currency
+
+
+class Principal:
+    """
+    Authenticated user as returned by get_current_user: stands in for the
+    User row (id, role, company) and is shared between requests, so it
+    is never modified.
+    """
+
+    __slots__ = ("id", "role", "company")
+
+    def __init__(self, id: int, role: str, company: CompanyPrincipal | None):
+        self.id = id
+        self.role = role
+        self.company = company
+
+
+class PrincipalCache:
+    """
+    TTL + LRU map of user id -> Principal. A generation counter per user
+    keeps a load that raced with invalidate() from being cached.
+    """
+
+    def __init__(self, max_entries: int = PRINCIPAL_CACHE_SIZE, ttl: int = PRINCIPAL_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return entry[1]
+
+    def generation(self, user_id: int) -> int:
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def set(self, user_id: int, principal: Principal, generation: int) -> None:
+        with self._lock:
+            if self._generations.get(user_id, 0) != generation:
+                return
+            self._entries[user_id] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            self._entries.pop(user_id, None)
+
+
+principal_cache = PrincipalCache()
+
+
+def load_principal(db: Session, user_id: int) -> Principal | None:
+    """
+    User and company in one query; cached, so repeat requests (and the
+    AJAX calls of a page) need no database access.
+    """
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    generation = principal_cache.generation(user_id)
+    row = (
+        db.query(User.id, User.role, Company.id, Company.status, Company.currency)
+        .outerjoin(Company, Company.user_id == User.id)
+        .filter(User.id == user_id)
+        .first()
+    )
+    if row is None:
+        return None
+
+    user_id, role, company_id, company_status, currency = row
+    company = CompanyPrincipal(company_id, company_status, currency) if company_id is not None else None
+    principal = Principal(user_id, role, company)
+
+    principal_cache.set(user_id, principal, generation)
+    return principal
+
+
+def invalidate_principal(user_id: int) -> None:
+    """
+    Call after changing a user's role / password or their company's
+    status / currency, or deleting either.
+    """
+    principal_cache.invalidate(user_id)
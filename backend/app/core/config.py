@@ -5,5 +5,9 @@ load_dotenv()
 
 class Settings:
     DATABASE_URL = os.getenv("DATABASE_URL")
+    # shared rendered-page cache (redis://...); in-process LRU when unset
+    PAGE_CACHE_URL = os.getenv("PAGE_CACHE_URL")
+    # public origin for links in emails / notifications
+    BASE_URL = os.getenv("BASE_URL", "")
 
 settings = Settings()
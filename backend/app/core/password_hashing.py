@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.security import hash_password, verify_and_update_password
+
+logger = logging.getLogger(__name__)
+
+# bcrypt releases the GIL, so these threads hash in parallel; a pool of
+# its own keeps a login burst off the AnyIO threadpool sync routes run on
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+# hashes running + waiting; further requests are turned away at once
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", "16"))
+
+
+class PasswordHashBusy(RuntimeError):
+    """The hashing queue is full; ask the user to retry shortly."""
+
+
+class PasswordHashPool:
+    """
+    Size-bounded executor for bcrypt with queue-depth counters (stats()).
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_QUEUE):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._peak_pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds = 0.0
+        self._hash_seconds = 0.0
+
+    def _run(self, queued_at: float, fn, args):
+        started = time.monotonic()
+        with self._lock:
+            self._running += 1
+            self._wait_seconds += started - queued_at
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._hash_seconds += time.monotonic() - started
+
+    def _done(self, _future) -> None:
+        # also runs for futures cancelled while queued (client went away)
+        with self._lock:
+            self._pending -= 1
+
+    def submit(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                rejected = self._rejected
+            else:
+                rejected = None
+                self._pending += 1
+                self._peak_pending = max(self._peak_pending, self._pending)
+
+        if rejected is not None:
+            logger.warning("Password hash queue full (%s pending), %s rejected so far", self.max_pending, rejected)
+            raise PasswordHashBusy("Password hashing queue is full")
+
+        try:
+            future = self._executor.submit(self._run, time.monotonic(), fn, args)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    async def run(self, fn, *args):
+        """
+        Run `fn(*args)` on the pool without holding an event-loop or AnyIO
+        thread while it waits. Raises PasswordHashBusy when full.
+        """
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def stats(self) -> dict:
+        with self._lock:
+            completed = self._completed
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "peak_pending": self._peak_pending,
+                "completed": completed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._wait_seconds * 1000 / completed, 1) if completed else 0.0,
+                "avg_hash_ms": round(self._hash_seconds * 1000 / completed, 1) if completed else 0.0,
+            }
+
+
+password_hash_pool = PasswordHashPool()
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_hash_pool.run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    (valid, new_hash) as verify_and_update_password, computed on the pool.
+    """
+    return await password_hash_pool.run(verify_and_update_password, plain_password, hashed_password)
@@ -1,4 +1,6 @@
 # app/core/templates.py
 from fastapi.templating import Jinja2Templates
+from app.utils.static_assets import asset_url
 
 templates = Jinja2Templates(directory="app/templates")
+templates.env.globals["asset_url"] = asset_url
@@ -2,11 +2,12 @@ from fastapi import FastAPI,Request,status
 from fastapi.templating import Jinja2Templates
 from fastapi.exceptions import HTTPException as FastAPIHTTPException
 from fastapi.responses import RedirectResponse
-from fastapi.staticfiles import StaticFiles
+from app.utils.static_assets import AssetStaticFiles
+from app.services.email_delivery_service import email_delivery
 from app.routers.web import auth, admin_dashboard, tour_package, company, manual_booking, driver, company_dashboard, customer 
 
 app = FastAPI()
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+app.mount("/static", AssetStaticFiles(directory="app/static"), name="static")
 
 app.include_router(auth.router)
 app.include_router(admin_dashboard.router)
@@ -18,6 +19,12 @@ app.include_router(company_dashboard.router)
 app.include_router(customer.router)
 
 
+@app.on_event("shutdown")
+async def flush_email_queue():
+    # send queued emails and close the pooled SMTP connections
+    await email_delivery.close()
+
+
 @app.exception_handler(FastAPIHTTPException)
 async def auth_exception_handler(request: Request, exc: FastAPIHTTPException):
     if exc.status_code == 401:
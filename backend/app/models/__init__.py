@@ -3,3 +3,5 @@ from .company import Company
 from .tour_package import TourPackage
 from .manual_booking import ManualBooking
 from .customer import Customer
+from .booking_daily_stats import BookingDailyStats
+from .whatsapp_outbox import WhatsAppOutbox
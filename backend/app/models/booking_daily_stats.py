@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, Date, Numeric, ForeignKey
+from app.database.base import Base
+
+
+class BookingDailyStats(Base):
+    """
+    Per-day booking rollup, maintained alongside manual_bookings so the
+    dashboard reads one row per (company, day, package) instead of
+    scanning every booking. Day is the booking's created_at date.
+    """
+    __tablename__ = "booking_daily_stats"
+
+    company_id = Column(
+        Integer,
+        ForeignKey("companies.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    day = Column(Date, primary_key=True)
+    tour_package_id = Column(
+        Integer,
+        ForeignKey("tour_packages.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+
+    booking_count = Column(Integer, nullable=False, server_default="0")
+    pending_count = Column(Integer, nullable=False, server_default="0")
+    pax = Column(Integer, nullable=False, server_default="0")
+    total_amount = Column(Numeric(14, 2), nullable=False, server_default="0")
+    advance_amount = Column(Numeric(14, 2), nullable=False, server_default="0")
+    remaining_amount = Column(Numeric(14, 2), nullable=False, server_default="0")
@@ -1,10 +1,38 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Computed, Index
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 from app.database.base import Base
 from datetime import datetime
 
 class Customer(Base):
     __tablename__ = "customers"
+    __table_args__ = (
+        # autocomplete: trigram match within one company (pg_trgm + btree_gin)
+        Index(
+            "ix_customers_company_guest_name_trgm",
+            "company_id", "guest_name",
+            postgresql_using="gin",
+            postgresql_ops={"guest_name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_customers_company_email_trgm",
+            "company_id", "email",
+            postgresql_using="gin",
+            postgresql_ops={"email": "gin_trgm_ops"},
+        ),
+        # autocomplete: phone prefix, with or without the country code
+        Index(
+            "ix_customers_company_phone_digits",
+            "company_id", "phone_digits",
+            postgresql_ops={"phone_digits": "varchar_pattern_ops"},
+        ),
+        Index(
+            "ix_customers_company_phone",
+            "company_id", "phone",
+            postgresql_ops={"phone": "varchar_pattern_ops"},
+        ),
+        Index("ix_customers_company_updated_at", "company_id", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
@@ -12,9 +40,18 @@ class Customer(Base):
     guest_name = Column(String(150), nullable=False)
     country_code = Column(String(10), nullable=False, server_default='+91')
     phone = Column(String(20), nullable=False)
+    # E.164 without the "+": country code and number, digits only
+    phone_digits = Column(
+        String(30),
+        Computed(
+            "regexp_replace(country_code || phone, '[^0-9]', '', 'g')",
+            persisted=True
+        )
+    )
     email = Column(String(150), nullable=True)
 
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     is_deleted = Column(Boolean, default=False)
 
     company = relationship("Company", back_populates="customers")
@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 from app.database.base import Base
 
 class Driver(Base):
     __tablename__ = "drivers"
+    __table_args__ = (
+        Index("ix_drivers_company_updated_at", "company_id", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(
@@ -20,6 +24,7 @@ class Driver(Base):
     seats = Column(Integer, nullable=True)
     image = Column(String, nullable=True)
     is_deleted = Column(Boolean, default=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     company = relationship("Company", backref="drivers")
 
     tour_packages = relationship(
@@ -7,16 +7,43 @@ from sqlalchemy import (
     Date,
     Time,
     Numeric,
-    DateTime
+    DateTime,
+    Index,
+    text
 )
 from sqlalchemy.sql import func
 from app.database.base import Base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, joinedload, contains_eager, load_only
+from app.models.customer import Customer
+from app.models.driver import Driver
+from app.models.tour_package import TourPackage
+
+# one live booking per driver per day, enforced by the database
+DRIVER_DAY_INDEX = "uq_manual_bookings_driver_travel_date"
+
 
 class ManualBooking(Base):
     __tablename__ = "manual_bookings"
+    __table_args__ = (
+        Index("ix_manual_bookings_company_travel_date", "company_id", "travel_date"),
+        Index("ix_manual_bookings_company_created_at", "company_id", "created_at"),
+        Index("ix_manual_bookings_company_updated_at", "company_id", "updated_at"),
+        Index(
+            DRIVER_DAY_INDEX,
+            "driver_id",
+            "travel_date",
+            unique=True,
+            postgresql_where=text("NOT is_deleted"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
+    # denormalized from tour_package so tenant-scoped reads skip the join
+    company_id = Column(
+        Integer,
+        ForeignKey("companies.id"),
+        nullable=False
+    )
     guest_name = Column(String(150), nullable=True)
     country_code = Column(String(10), nullable=True, server_default='+91')
     phone = Column(String(20), nullable=True)
@@ -46,7 +73,66 @@ class ManualBooking(Base):
     ) 
     is_deleted = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     tour_package = relationship("TourPackage")
     driver = relationship("Driver", back_populates="bookings")
     customer = relationship("Customer", back_populates="bookings")
+
+    @classmethod
+    def query_for(cls, db, view: str = "detail"):
+        """
+        Booking query with the eager loads and column projections a view
+        needs, so customer / package / driver come back in the same
+        statement instead of one lazy load per row.
+
+        list         – bookings datatable (joins package & customer so
+                       callers can filter and order on them)
+        detail       – booking detail and edit pages
+        notification – WhatsApp / message templates
+        """
+        query = db.query(cls)
+
+        if view == "list":
+            return (
+                query
+                .join(cls.tour_package)
+                .outerjoin(cls.customer)
+                .options(
+                    load_only(
+                        cls.adults, cls.kids, cls.travel_date, cls.travel_time,
+                        cls.pickup_location, cls.total_amount, cls.advance_amount,
+                        cls.remaining_amount, cls.payment_status,
+                    ),
+                    contains_eager(cls.tour_package).load_only(
+                        TourPackage.title, TourPackage.currency
+                    ),
+                    contains_eager(cls.customer).load_only(
+                        Customer.guest_name, Customer.country_code,
+                        Customer.phone, Customer.email,
+                    ),
+                )
+            )
+
+        if view == "detail":
+            return query.options(
+                joinedload(cls.customer),
+                joinedload(cls.tour_package),
+                joinedload(cls.driver),
+            )
+
+        if view == "notification":
+            return query.options(
+                joinedload(cls.customer).load_only(
+                    Customer.guest_name, Customer.country_code, Customer.phone
+                ),
+                joinedload(cls.tour_package).load_only(
+                    TourPackage.title, TourPackage.currency, TourPackage.itinerary
+                ),
+                joinedload(cls.driver).load_only(
+                    Driver.name, Driver.country_code, Driver.phone_number,
+                    Driver.vehicle_type, Driver.vehicle_number,
+                ),
+            )
+
+        raise ValueError(f"Unknown booking view: {view}")
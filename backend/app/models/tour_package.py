@@ -1,14 +1,25 @@
 from locale import currency
 from sqlalchemy import (
     Column, Integer, String, Text, Float,
-    Boolean, ForeignKey, Enum
+    Boolean, ForeignKey, Enum, Computed, Index, DateTime, Numeric, cast, func
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from app.database.base import Base
 
+# text search configuration of TourPackage.search_vector; queries must use
+# the same one so stemming matches
+SEARCH_CONFIG = "english"
+# search ranks are rounded to this many decimals: an exact numeric that
+# round-trips through a page cursor (ts_rank's float4 does not)
+SEARCH_RANK_SCALE = 6
+
 
 class TourPackage(Base):
     __tablename__ = "tour_packages"
+    __table_args__ = (
+        Index("ix_tour_packages_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
@@ -22,6 +33,22 @@ class TourPackage(Base):
     excludes = Column(Text, nullable=True)
     status = Column(String(20), default="active")  
     is_deleted = Column(Boolean, default=False)
+    # denormalized from the "cover" gallery image for listing cards
+    cover_image_path = Column(String(255), nullable=True)
+    # resized WebP / JPEG copies of the cover, see TourPackageGalleryImage.variants
+    cover_image_variants = Column(JSONB, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    # weighted full-text document: title > city / country > description
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(city, '')), 'B') || "
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(country, '')), 'B') || "
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'C')",
+            persisted=True
+        )
+    ))
     company = relationship("Company", back_populates="tour_packages")
     gallery_images = relationship(
         "TourPackageGalleryImage",
@@ -34,6 +61,20 @@ class TourPackage(Base):
         cascade="all, delete-orphan"
     )
 
+    @classmethod
+    def search(cls, query, term: str):
+        """
+        Filter `query` to packages matching the web-search style `term`
+        ("desert safari", "dubai -cruise", quoted phrases) via the GIN
+        index; returns (query, rank) so callers can order by relevance.
+        The rank is a numeric (SEARCH_RANK_SCALE decimals), exact to
+        compare against a rank taken from a cursor.
+        """
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, term)
+        rank = func.round(cast(func.ts_rank(cls.search_vector, ts_query), Numeric), SEARCH_RANK_SCALE)
+
+        return query.filter(cls.search_vector.bool_op("@@")(ts_query)), rank
+
 class TourPackageGalleryImage(Base):
     __tablename__ = "tour_package_gallery_images"
 
@@ -46,6 +87,9 @@ class TourPackageGalleryImage(Base):
 
     image_path = Column(String(255), nullable=False)
     image_type = Column(String(20), nullable=False)  # cover | gallery
+    # {"thumb" | "card" | "full": {"width", "webp", "jpeg"}}, filled in the
+    # background after upload; None until then
+    variants = Column(JSONB, nullable=True)
 
     tour_package = relationship("TourPackage", back_populates="gallery_images")
 
@@ -0,0 +1,47 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from app.database.base import Base
+
+OUTBOX_PENDING = "pending"
+OUTBOX_SENDING = "sending"
+OUTBOX_SENT = "sent"
+OUTBOX_FAILED = "failed"
+
+
+class WhatsAppOutbox(Base):
+    """
+    WhatsApp messages waiting for (or done with) delivery. Rows are added
+    in the transaction that creates the booking, with the Graph API body
+    already rendered, and sent by app.services.whatsapp_outbox_service.
+
+    pending -> sending (claimed until next_attempt_at) -> sent
+                                                       -> pending (retry)
+                                                       -> failed
+    """
+    __tablename__ = "whatsapp_outbox"
+    __table_args__ = (
+        # the worker only ever looks for due, undelivered rows
+        Index(
+            "ix_whatsapp_outbox_due",
+            "next_attempt_at",
+            postgresql_where=text("status IN ('pending', 'sending')"),
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    company_id = Column(Integer, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False, index=True)
+    booking_id = Column(Integer, ForeignKey("manual_bookings.id", ondelete="SET NULL"), nullable=True, index=True)
+
+    template = Column(String(100), nullable=False)
+    to_phone = Column(String(30), nullable=False)
+    payload = Column(JSONB, nullable=False)
+
+    status = Column(String(20), nullable=False, server_default=OUTBOX_PENDING)
+    attempts = Column(Integer, nullable=False, server_default="0")
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error = Column(Text, nullable=True)
+    provider_message_id = Column(String(255), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
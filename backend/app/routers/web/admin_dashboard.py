@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Request, Depends
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse
 
 from app.core.templates import templates
-from app.auth.dependencies import get_current_user
+from app.core.password_hashing import password_hash_pool
+from app.auth.dependencies import admin_only, get_current_user
 from app.models.user import User
 
 router = APIRouter(
@@ -21,3 +22,13 @@ def dashboard(
             "request": request,
         }
     )
+
+
+@router.get("/metrics/password-hashing", name="password_hashing_metrics")
+def password_hashing_metrics(
+    current_user: User = Depends(admin_only),
+):
+    """
+    Queue depth / latency of the bcrypt pool in this worker process.
+    """
+    return JSONResponse(password_hash_pool.stats())
@@ -1,17 +1,22 @@
 from fastapi import APIRouter, Form, Depends,BackgroundTasks, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from app.core.templates import templates
 from app.database.session import get_db
 from app.models.user import User
-from app.core.security import ALGORITHM, SECRET_KEY, hash_password, verify_password, create_access_token, create_reset_token, verify_reset_token
+from app.core.security import ALGORITHM, SECRET_KEY, create_access_token, create_reset_token, verify_reset_token
+from app.core.password_hashing import PasswordHashBusy, hash_password_async, verify_password_async
 from app.schemas.user import LoginForm
 from app.auth.dependencies import get_current_user
+from app.auth.principal_cache import invalidate_principal
 from fastapi.responses import HTMLResponse
 from app.auth.dependencies import redirect_to_login
 from app.services.email_service import send_reset_password_email
+from app.utils.rate_limit import TokenBucketLimiter
 from jose import jwt
 from dotenv import load_dotenv
+import math
 import os
 
 BASE_URL = os.getenv("BASE_URL")
@@ -21,6 +26,45 @@ load_dotenv()
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
+# 🔒 throttles in front of bcrypt (login + password reset): a burst of 10
+# per client IP, then one every 6 s; 5 per email, then one every 30 s
+ip_limiter = TokenBucketLimiter(capacity=10, refill_seconds=6)
+email_limiter = TokenBucketLimiter(capacity=5, refill_seconds=30)
+
+BUSY_MESSAGE = "The server is busy. Please try again in a moment."
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def too_many_attempts(retry_after: float) -> str:
+    return f"Too many attempts. Please try again in {math.ceil(retry_after)} seconds."
+
+
+# The async routes below await bcrypt on its pool; their queries and
+# commits go through these helpers on the threadpool, never the event loop
+def find_login_user(db: Session, email: str):
+    """
+    User for `email` with its company loaded, or None.
+    """
+    return (
+        db.query(User)
+        .options(joinedload(User.company))
+        .filter(User.email == email)
+        .first()
+    )
+
+
+def find_user(db: Session, user_id):
+    return db.query(User).filter(User.id == user_id).first()
+
+
+def save_password_hash(db: Session, user: User, password_hash: str) -> None:
+    user.password_hash = password_hash
+    db.commit()
+
+
 # ------------------------
 # Login Page
 # ------------------------
@@ -38,22 +82,45 @@ def login_page(request: Request):
 # Login Submit
 # ------------------------
 @router.post("/login", response_class=HTMLResponse, name="login_submit")
-def login(
+async def login(
     request: Request,
     form: LoginForm = Depends(LoginForm.as_form),
     db: Session = Depends(get_db)
 ):
-    user = db.query(User).filter(User.email == form.email).first()
+    retry_after = max(
+        ip_limiter.consume(client_ip(request)),
+        email_limiter.consume(form.email.lower()),
+    )
+    if retry_after:
+        return redirect_to_login(request, too_many_attempts(retry_after))
+
+    user = await run_in_threadpool(find_login_user, db, form.email)
 
-    if not user or not verify_password(form.password, user.password_hash):
+    if not user:
+        return redirect_to_login(request, "Invalid email or password")
+
+    # bcrypt on its own bounded pool, not the shared threadpool
+    try:
+        valid, new_hash = await verify_password_async(form.password, user.password_hash)
+    except PasswordHashBusy:
+        return redirect_to_login(request, BUSY_MESSAGE)
+
+    if not valid:
         return redirect_to_login(request, "Invalid email or password")
         
     if user.company.status == "inactive":
         return redirect_to_login(request, "Your company account is inactive. Please contact support.")
 
+    # read before the commit below expires the row
+    user_id, role = user.id, user.role
+
+    # 🔁 stored with an outdated cost (BCRYPT_ROUNDS changed): replace it
+    if new_hash:
+        await run_in_threadpool(save_password_hash, db, user, new_hash)
+
     token = create_access_token({
-        "user_id": user.id,
-        "role": user.role
+        "user_id": user_id,
+        "role": role
     })
 
     response = RedirectResponse(
@@ -70,7 +137,7 @@ def login(
     
     response.set_cookie(
         key="user_role",
-        value=user.role,
+        value=role,
         httponly=False,
         samesite="lax"
     )
@@ -139,13 +206,25 @@ def reset_password_page(request: Request, token: str):
 
 
 @router.post("/reset-password", name="reset_password_submit")
-def reset_password_submit(
+async def reset_password_submit(
     request: Request,
     token: str = Form(...),
     password: str = Form(...),
     confirm_password: str = Form(...),
     db: Session = Depends(get_db)
 ):
+    retry_after = ip_limiter.consume(client_ip(request))
+    if retry_after:
+        return templates.TemplateResponse(
+            "auth/reset_password.html",
+            {
+                "request": request,
+                "token": token,
+                "error": too_many_attempts(retry_after)
+            },
+            status_code=429
+        )
+
     if password != confirm_password:
         return templates.TemplateResponse(
             "auth/reset_password.html",
@@ -160,7 +239,7 @@ def reset_password_submit(
     payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     user_id = payload.get("sub")
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await run_in_threadpool(find_user, db, user_id)
 
     if not user:
         return templates.TemplateResponse(
@@ -171,9 +250,22 @@ def reset_password_submit(
             },
             status_code=400
         )
+    user_id = user.id
 
-    user.password_hash = hash_password(password)
-    db.commit()
+    try:
+        password_hash = await hash_password_async(password)
+    except PasswordHashBusy:
+        return templates.TemplateResponse(
+            "auth/reset_password.html",
+            {
+                "request": request,
+                "token": token,
+                "error": BUSY_MESSAGE
+            },
+            status_code=503
+        )
+    await run_in_threadpool(save_password_hash, db, user, password_hash)
+    invalidate_principal(user_id)
 
     return RedirectResponse(
         request.url_for("login_page"),
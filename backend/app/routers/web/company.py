@@ -1,8 +1,8 @@
-import os, uuid
 from fastapi import (
     APIRouter, Depends, Request, Form, UploadFile, File, Query, BackgroundTasks
 
 )
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import (
     HTMLResponse, RedirectResponse, JSONResponse
 )
@@ -12,13 +12,16 @@ from pydantic import ValidationError
 
 from app.database.session import get_db
 from app.core.templates import templates
-from app.core.security import hash_password
+from app.core.password_hashing import PasswordHashBusy, hash_password_async
 from app.auth.dependencies import admin_only, get_current_user
+from app.auth.principal_cache import invalidate_principal
 from app.models.company import Company
 from app.models.user import User
 from app.schemas.company import CompanyCreate, CompanyUpdate
 from app.core.constants import COUNTRIES, CURRENCIES, COUNTRY_CODES
 from app.utils.flash import flash_redirect
+from app.utils.file_upload import save_upload, UploadRejected
+from app.utils.datatable import columnar, url_template
 from app.services.email_service import send_company_created_email
 
 # -------------------------------------------------
@@ -26,9 +29,6 @@ from app.services.email_service import send_company_created_email
 # -------------------------------------------------
 router = APIRouter(prefix="/companies", tags=["Companies"])
 
-UPLOAD_DIR = "app/static/uploads/companies"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
 # -------------------------------------------------
 # Helper: redirect with flash message
 # -------------------------------------------------
@@ -66,12 +66,40 @@ def render_form(
         status_code=status_code
     )
     
+DATATABLE_COLUMNS = {
+    "id": Company.id,
+    "company_name": Company.company_name,
+    "email": User.email,
+    "country_code": Company.country_code,
+    "phone": Company.phone,
+    "status": Company.status,
+}
+
 @router.get("/datatable", name="company_datatable")
 def company_datatable(
     request: Request,
+    fmt: str = Query("rows", alias="format", pattern="^(rows|columns)$"),
     db: Session = Depends(get_db),
     _=Depends(admin_only)
 ):
+    if fmt == "columns":
+        rows = (
+            db.query(*DATATABLE_COLUMNS.values())
+            .join(User, Company.user_id == User.id)
+            .filter(
+                Company.is_deleted == False,
+                User.role == "company"
+            )
+            .all()
+        )
+        return JSONResponse({
+            "columns": columnar(rows, DATATABLE_COLUMNS),
+            "urls": {
+                "edit": url_template(request, "company_edit_page"),
+                "delete": url_template(request, "company_delete"),
+            },
+        })
+
     companies = (
         db.query(Company)
         .filter(
@@ -136,6 +164,24 @@ def create_page(
 
     return render_form(request, currencies=CURRENCIES, countries=COUNTRIES, country_codes=COUNTRY_CODES)
 
+def email_taken(db: Session, email: str) -> bool:
+    return db.query(User.id).filter(User.email == email).first() is not None
+
+
+def create_company_account(db: Session, user: User, company: Company) -> None:
+    """
+    Save the login `user`, then `company` owned by it. Runs on the
+    threadpool: create_company itself awaits the password hash.
+    """
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+
+    company.user_id = user.id
+    db.add(company)
+    db.commit()
+
+
 @router.post("/create", name="company_create")
 async def create_company(
     request: Request,
@@ -169,7 +215,7 @@ async def create_company(
             status_code=400,
         )
 
-    if db.query(User).filter(User.email == email).first():
+    if await run_in_threadpool(email_taken, db, email):
         return render_form(
             request,
             form=locals(),
@@ -182,27 +228,28 @@ async def create_company(
     # ✅ Create user
     temp_password = "12345678"
 
-    user = User(
-        email=email,
-        password_hash=hash_password(temp_password),
-        role="company",
-    )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    try:
+        password_hash = await hash_password_async(temp_password)
+    except PasswordHashBusy:
+        return flash_redirect(
+            url=request.url_for("company_create_page"),
+            message="The server is busy. Please try again in a moment.",
+            category="error"
+        )
 
-    # ✅ Create company
-    company = Company(
-        user_id=user.id,
-        company_name=company_name,
-        country=country,    
-        country_code=country_code,
-        phone=phone,
-        currency=currency,
-        status="active",
+    await run_in_threadpool(
+        create_company_account,
+        db,
+        User(email=email, password_hash=password_hash, role="company"),
+        Company(
+            company_name=company_name,
+            country=country,
+            country_code=country_code,
+            phone=phone,
+            currency=currency,
+            status="active",
+        ),
     )
-    db.add(company)
-    db.commit()
 
     # ✅ SEND EMAIL AFTER DB COMMIT (BACKGROUND)
     background_tasks.add_task(
@@ -274,6 +321,7 @@ def update_company(
     company.currency = currency
     company.country = country
     db.commit()
+    invalidate_principal(company.user_id)
     
     return flash_redirect(
         url=request.url_for("company_list"),
@@ -295,9 +343,11 @@ def delete_company(
     if not company:
         return redirect_with_message(request, "Company not found")
 
+    user_id = company.user_id
     db.delete(company.user)
     db.delete(company)
     db.commit()
+    invalidate_principal(user_id)
 
     return True
 
@@ -307,13 +357,15 @@ def delete_company(
 @router.get("/my-profile", response_class=HTMLResponse, name="my_profile")
 def my_profile(
     request: Request,
+    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
 
     if not current_user.company:
         return redirect_with_message(request, "Company profile not found")
 
-    company = current_user.company
+    # current_user is the cached principal; the form needs the full rows
+    company = db.get(Company, current_user.company.id)
 
     return render_form(
         request,
@@ -323,7 +375,7 @@ def my_profile(
         countries=COUNTRIES,
         form={
             "company_name": company.company_name,
-            "email": current_user.email,
+            "email": company.user.email,
             "country_code": company.country_code,
             "phone": company.phone,
             "currency": company.currency,
@@ -345,7 +397,10 @@ def update_my_profile(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    company = current_user.company
+    if not current_user.company:
+        return redirect_with_message(request, "Company profile not found")
+
+    company = db.get(Company, current_user.company.id)
 
     # ✅ Validate using CompanyUpdate
     try:
@@ -375,14 +430,14 @@ def update_my_profile(
         )
 
     if logo and logo.filename:
-        ext = logo.filename.split(".")[-1].lower()
-        filename = f"company_{company.id}_{uuid.uuid4().hex}.{ext}"
-        filepath = os.path.join(UPLOAD_DIR, filename)
-
-        with open(filepath, "wb") as f:
-            f.write(logo.file.read())
-
-        company.logo = f"uploads/companies/{filename}"
+        try:
+            company.logo = save_upload(logo, "company_logo")
+        except UploadRejected as e:
+            return flash_redirect(
+                url=request.url_for("my_profile"),
+                message=str(e),
+                category="error"
+            )
 
     # ✅ Update fields
     company.company_name = form.company_name
@@ -392,6 +447,7 @@ def update_my_profile(
     company.country = form.country
 
     db.commit()
+    invalidate_principal(current_user.id)
 
     return flash_redirect(
         url=request.url_for("my_profile"),
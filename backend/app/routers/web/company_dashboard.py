@@ -6,16 +6,14 @@ from app.database.session import get_db
 from app.models.manual_booking import ManualBooking
 from app.models.user import User
 from app.models.tour_package import TourPackage
+from app.models.booking_daily_stats import BookingDailyStats
 from app.auth.dependencies import get_current_user
+from app.utils.http_cache import row_versions, validators, not_modified, with_validators
 from typing import Optional
-from datetime import datetime
-from sqlalchemy import extract, func
+from datetime import datetime, date
 from fastapi import Depends
 from sqlalchemy.orm import Session
-from fastapi.templating import Jinja2Templates
-
-# Templates directory
-templates = Jinja2Templates(directory="app/templates")
+from app.core.templates import templates
 
 router = APIRouter(prefix="/company/dashboard", tags=["Dashboard"])
 
@@ -46,7 +44,10 @@ def customers_datatable(
 ):
     bookings = (
         db.query(ManualBooking)
-        .filter(ManualBooking.is_deleted == False)
+        .filter(
+            ManualBooking.company_id == current_user.company.id,
+            ManualBooking.is_deleted == False
+        )
         .all()
     )
 
@@ -89,100 +90,149 @@ def active_packages_datatable(
 # =================================================
 # KPI SUMMARY
 # =================================================
-@router.get("/summary", name="dashboard_summary")
-def dashboard_summary(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
+def company_of(current_user: User):
     """
-    Returns dashboard KPI summary (bookings, revenue, pending payments)
+    The user's company, or None for users without one (admins), who see
+    the totals across every company.
     """
-    total_bookings = db.query(ManualBooking).filter(ManualBooking.is_deleted == False).count()
+    return current_user.company if current_user else None
 
-    pending_payments = db.query(ManualBooking).filter(
-        ManualBooking.is_deleted == False,
-        ManualBooking.payment_status != "paid"
-    ).count()
 
-    total_revenue = db.query(
-        func.coalesce(func.sum(ManualBooking.total_amount), 0)
-    ).filter(ManualBooking.is_deleted == False).scalar()
+def booking_summary(db: Session, company_id: Optional[int]) -> dict:
+    """
+    Bookings, pending payments and revenue from the daily rollup.
+    """
+    query = db.query(
+        func.coalesce(func.sum(BookingDailyStats.booking_count), 0),
+        func.coalesce(func.sum(BookingDailyStats.pending_count), 0),
+        func.coalesce(func.sum(BookingDailyStats.total_amount), 0),
+    )
+    if company_id is not None:
+        query = query.filter(BookingDailyStats.company_id == company_id)
+    total_bookings, pending_payments, total_revenue = query.one()
 
-    return JSONResponse({
-        "total_bookings": total_bookings,
-        "pending_payments": pending_payments,
+    return {
+        "total_bookings": int(total_bookings),
+        "pending_payments": int(pending_payments),
         "total_revenue": float(total_revenue)
-    })
+    }
 
-@router.get("/dashboard-stats", name="dashboard_stats")
-def dashboard_stats(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
+
+def booking_stats(db: Session, current_user: User) -> dict:
+    """
+    Monthly booking counts and revenue for the current year, grouped by
+    date_trunc('month') over the daily rollup rows of that year.
+    """
     now = datetime.now()
     current_year = now.year
     current_month = now.month
 
-    company = current_user.company if current_user else None
-    currency = company.currency if company else "USD"
-
-    # Monthly bookings
-    monthly_bookings = []
-    for month in range(1, 13):
-        count = (
-            db.query(func.count(ManualBooking.id))
-            .filter(
-                ManualBooking.is_deleted == False,
-                extract("year", ManualBooking.created_at) == current_year,
-                extract("month", ManualBooking.created_at) == month
-            )
-            .scalar()
-        )
-        monthly_bookings.append(count)
-
-    yearly_bookings = sum(monthly_bookings)
-    monthly_bookings_current = monthly_bookings[current_month - 1]
+    company = company_of(current_user)
+    currency = (company.currency if company else None) or "USD"
 
-    yearly_revenue = (
-        db.query(func.coalesce(func.sum(ManualBooking.total_amount), 0))
-        .filter(
-            ManualBooking.is_deleted == False,
-            extract("year", ManualBooking.created_at) == current_year
+    month = func.date_trunc("month", BookingDailyStats.day).label("month")
+    query = (
+        db.query(
+            month,
+            func.sum(BookingDailyStats.booking_count),
+            func.coalesce(func.sum(BookingDailyStats.total_amount), 0),
         )
-        .scalar()
-    )
-
-    monthly_revenue = (
-        db.query(func.coalesce(func.sum(ManualBooking.total_amount), 0))
         .filter(
-            ManualBooking.is_deleted == False,
-            extract("year", ManualBooking.created_at) == current_year,
-            extract("month", ManualBooking.created_at) == current_month
+            BookingDailyStats.day >= date(current_year, 1, 1),
+            BookingDailyStats.day < date(current_year + 1, 1, 1),
         )
-        .scalar()
     )
+    if company is not None:
+        query = query.filter(BookingDailyStats.company_id == company.id)
+    rows = query.group_by(month).all()
 
-    monthly_revenue_per_year = []
-    for month in range(1, 13):
-        revenue = (
-            db.query(func.coalesce(func.sum(ManualBooking.total_amount), 0))
-            .filter(
-                ManualBooking.is_deleted == False,
-                extract("year", ManualBooking.created_at) == current_year,
-                extract("month", ManualBooking.created_at) == month
-            )
-            .scalar()
-        )
-        monthly_revenue_per_year.append(float(revenue))
+    monthly_bookings = [0] * 12
+    monthly_revenue_per_year = [0.0] * 12
+    for month_start, count, revenue in rows:
+        monthly_bookings[month_start.month - 1] = int(count)
+        monthly_revenue_per_year[month_start.month - 1] = float(revenue)
 
-    return JSONResponse({
+    return {
         "year": current_year,
         "month": current_month,
         "currency": currency,
-        "yearly_bookings": yearly_bookings,
-        "monthly_bookings": monthly_bookings_current,
+        "yearly_bookings": sum(monthly_bookings),
+        "monthly_bookings": monthly_bookings[current_month - 1],
         "monthly_bookings_per_year": monthly_bookings,
-        "yearly_revenue": float(yearly_revenue),
-        "monthly_revenue": float(monthly_revenue),
+        "yearly_revenue": sum(monthly_revenue_per_year),
+        "monthly_revenue": monthly_revenue_per_year[current_month - 1],
         "monthly_revenue_per_year": monthly_revenue_per_year,
-    })
\ No newline at end of file
+    }
+
+
+def dashboard_validators(db: Session, current_user: User) -> tuple:
+    """
+    The rollup only changes together with the company's bookings; the
+    date (current year / month) and currency shape the payload too.
+    """
+    company = company_of(current_user)
+    if company is None:
+        return validators(db, row_versions(ManualBooking.updated_at), extra=(date.today(), None))
+    return validators(
+        db,
+        row_versions(ManualBooking.updated_at, ManualBooking.company_id == company.id),
+        extra=(date.today(), company.currency),
+    )
+
+
+@router.get("/summary", name="dashboard_summary")
+def dashboard_summary(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Returns dashboard KPI summary (bookings, revenue, pending payments)
+    """
+    etag, last_modified = dashboard_validators(db, current_user)
+    unchanged = not_modified(request, etag, last_modified)
+    if unchanged:
+        return unchanged
+
+    company = company_of(current_user)
+    return with_validators(
+        JSONResponse(booking_summary(db, company.id if company else None)),
+        etag, last_modified
+    )
+
+@router.get("/dashboard-stats", name="dashboard_stats")
+def dashboard_stats(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    etag, last_modified = dashboard_validators(db, current_user)
+    unchanged = not_modified(request, etag, last_modified)
+    if unchanged:
+        return unchanged
+
+    return with_validators(
+        JSONResponse(booking_stats(db, current_user)),
+        etag, last_modified
+    )
+
+@router.get("/overview", name="dashboard_overview")
+def dashboard_overview(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Combined payload for the dashboard widgets (KPI cards + booking
+    chart) so the page loads them with one request.
+    """
+    etag, last_modified = dashboard_validators(db, current_user)
+    unchanged = not_modified(request, etag, last_modified)
+    if unchanged:
+        return unchanged
+
+    company = company_of(current_user)
+    return with_validators(JSONResponse({
+        **booking_stats(db, current_user),
+        "summary": booking_summary(db, company.id if company else None),
+    }), etag, last_modified)
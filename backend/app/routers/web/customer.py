@@ -4,13 +4,14 @@ from app.database.session import get_db
 from app.models.user import User
 from app.auth.dependencies import company_only
 from fastapi import (
-    APIRouter, Depends, Request, Form, UploadFile, File
+    APIRouter, Depends, Request, Form, UploadFile, File, Query
 )
 from app.core.constants import COUNTRY_CODES
 from sqlalchemy.orm import Session
 from app.core.templates import templates
 from app.models.customer import Customer
 from app.utils.flash import flash_redirect
+from app.utils.datatable import columnar, url_template
 from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
 from sqlalchemy import or_
 
@@ -48,15 +49,44 @@ def customer_list(
 ):
     return templates.TemplateResponse("customers/list.html", {"request": request})
 
+DATATABLE_COLUMNS = {
+    "id": Customer.id,
+    "guest_name": Customer.guest_name,
+    "country_code": Customer.country_code,
+    "phone": Customer.phone,
+    "email": Customer.email,
+}
+
 @router.get("/customers/datatable", name="customers_datatable")
 def customers_datatable(
     request: Request,
+    fmt: str = Query("rows", alias="format", pattern="^(rows|columns)$"),
     db: Session = Depends(get_db),
     current_user: User = Depends(company_only)
 ):
+    if fmt == "columns":
+        rows = (
+            db.query(*DATATABLE_COLUMNS.values())
+            .filter(
+                Customer.company_id == current_user.company.id,
+                Customer.is_deleted == False
+            )
+            .all()
+        )
+        return JSONResponse({
+            "columns": columnar(rows, DATATABLE_COLUMNS),
+            "urls": {
+                "edit": url_template(request, "customer_edit_page"),
+                "delete": url_template(request, "customer_delete"),
+            },
+        })
+
     customers = (
         db.query(Customer)
-        .filter(Customer.is_deleted == False)
+        .filter(
+            Customer.company_id == current_user.company.id,
+            Customer.is_deleted == False
+        )
         .all()
     )
     edit_icon = "/static/assets/icon/edit.svg"
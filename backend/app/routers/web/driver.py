@@ -1,6 +1,5 @@
-import os, uuid
 from fastapi import (
-    APIRouter, Depends, Request, Form, UploadFile, File
+    APIRouter, Depends, Request, Form, UploadFile, File, Query
 )
 from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
 from sqlalchemy.orm import Session
@@ -12,6 +11,10 @@ from app.auth.dependencies import company_only
 from app.models.driver import Driver
 from app.schemas.driver import DriverCreate, DriverUpdate
 from app.utils.flash import flash_redirect
+from app.utils.file_upload import save_upload, UploadRejected
+from app.utils.datatable import columnar, url_template
+from app.utils.http_cache import row_versions, validators, not_modified, with_validators
+from app.services.availability_service import invalidate_availability
 from app.models.user import User
 
 
@@ -20,9 +23,6 @@ from app.models.user import User
 # -------------------------------------------------
 router = APIRouter(prefix="/drivers", tags=["Drivers"])
 
-UPLOAD_DIR = "app/static/uploads/drivers"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
 # -------------------------------------------------
 # Helper: render form
 # -------------------------------------------------
@@ -63,12 +63,47 @@ def driver_list(
 # =================================================
 # DATATABLE API
 # =================================================
+DATATABLE_COLUMNS = {
+    "id": Driver.id,
+    "name": Driver.name,
+    "country_code": Driver.country_code,
+    "phone_number": Driver.phone_number,
+    "vehicle_type": Driver.vehicle_type,
+    "vehicle_number": Driver.vehicle_number,
+    "seats": Driver.seats,
+}
+
 @router.get("/datatable", name="driver_datatable")
 def driver_datatable(
     request: Request,
+    fmt: str = Query("rows", alias="format", pattern="^(rows|columns)$"),
     db: Session = Depends(get_db),
     current_user: User = Depends(company_only)
 ):
+    # edit / delete links are absolute, so the host is part of the payload
+    etag, last_modified = validators(
+        db,
+        row_versions(Driver.updated_at, Driver.company_id == current_user.company.id),
+        extra=(fmt, str(request.base_url)),
+    )
+    unchanged = not_modified(request, etag, last_modified)
+    if unchanged:
+        return unchanged
+
+    if fmt == "columns":
+        rows = (
+            db.query(*DATATABLE_COLUMNS.values())
+            .filter(Driver.is_deleted == False, Driver.company_id == current_user.company.id)
+            .all()
+        )
+        return with_validators(JSONResponse({
+            "columns": columnar(rows, DATATABLE_COLUMNS),
+            "urls": {
+                "edit": url_template(request, "driver_edit_page"),
+                "delete": url_template(request, "driver_delete"),
+            },
+        }), etag, last_modified)
+
     drivers = db.query(Driver).filter(Driver.is_deleted == False, Driver.company_id == current_user.company.id).all()
 
     data = []
@@ -95,7 +130,7 @@ def driver_datatable(
             """
         })
 
-    return JSONResponse({"data": data})
+    return with_validators(JSONResponse({"data": data}), etag, last_modified)
 
 # =================================================
 # CREATE
@@ -108,7 +143,7 @@ def create_page(
     return render_form(request, country_codes=COUNTRY_CODES)
 
 @router.post("/create", name="driver_create")
-async def driver_create(
+def driver_create(
     request: Request,
     name: str = Form(...),
     country_code: str = Form(...),
@@ -133,14 +168,14 @@ async def driver_create(
 
     # ✅ IMAGE UPLOAD
     if image and image.filename:
-        ext = image.filename.split(".")[-1]
-        filename = f"driver_{uuid.uuid4().hex}.{ext}"
-        path =  os.path.join(UPLOAD_DIR, filename)
-
-        with open(path, "wb") as f:
-            f.write(image.file.read())
-
-        driver.image = f"uploads/drivers/{filename}"
+        try:
+            driver.image = save_upload(image, "driver_image")
+        except UploadRejected as e:
+            return flash_redirect(
+                url=request.url_for("driver_create_page"),
+                message=str(e),
+                category="error"
+            )
 
     db.add(driver)
     db.commit()
@@ -199,14 +234,17 @@ def update_driver(
     driver.phone_number = phone_number
 
     if image and image.filename:
-        ext = image.filename.split(".")[-1]
-        filename = f"driver_{uuid.uuid4().hex}.{ext}"
-        path = os.path.join(UPLOAD_DIR, filename)
-        with open(path, "wb") as f:
-            f.write(image.file.read())
-        driver.image = f"uploads/drivers/{filename}"
+        try:
+            driver.image = save_upload(image, "driver_image")
+        except UploadRejected as e:
+            return flash_redirect(
+                url=request.url_for("driver_edit_page", driver_id=driver.id),
+                message=str(e),
+                category="error"
+            )
 
     db.commit()
+    invalidate_availability(driver.company_id)
 
     return flash_redirect(
         url=request.url_for("driver_list"),
@@ -226,4 +264,5 @@ def delete_driver(
     if driver:
         driver.is_deleted = True
         db.commit()
+        invalidate_availability(driver.company_id)
     return True
@@ -1,9 +1,10 @@
 from urllib import request
-from fastapi import APIRouter, Depends,Query, Request, Form
-from sqlalchemy.orm import Session
+import re
+from fastapi import APIRouter, Depends,Query, Request, Form, HTTPException
+from sqlalchemy.orm import Session, joinedload
 from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from app.database.session import get_db
-from app.models.manual_booking import ManualBooking
+from app.models.manual_booking import ManualBooking, DRIVER_DAY_INDEX
 from app.models.tour_package import TourPackage,TourPackageDriver
 from app.models.driver import Driver
 from app.models.customer import Customer
@@ -11,15 +12,39 @@ from app.schemas.manual_booking import ManualBookingCreate
 from app.core.templates import templates
 from app.auth.dependencies import admin_only, company_only
 from app.utils.flash import flash_redirect
+from app.utils.datatable import datatable_params, datatable_response, columnar, url_template
+from app.utils.http_cache import (
+    cached_json_response,
+    row_versions,
+    validators,
+    not_modified,
+    with_validators,
+)
 from typing import Optional, List
-from sqlalchemy import func,and_,or_, cast, String
-from datetime import date
+from sqlalchemy import func,and_,or_, cast, String, tuple_
+from sqlalchemy.exc import IntegrityError
+from datetime import date, timedelta
 from twilio.rest import Client
 from app.core.constants import COUNTRY_CODES
-from app.services.whatsapp_service import send_whatsapp_booking_confirmation, format_phone
+from app.services.whatsapp_service import enqueue_booking_notifications, format_phone
+from app.services.booking_stats_service import booking_stats_delta, apply_booking_stats
+from app.services.driver_assignment_service import auto_assign_drivers
+from app.services.availability_service import (
+    available_drivers,
+    seat_availability,
+    cached_package_heatmap,
+    invalidate_availability,
+)
 
 router = APIRouter(prefix="/manual-bookings", tags=["Manual Booking"])
 
+
+def is_driver_day_conflict(exc: IntegrityError) -> bool:
+    """
+    True when the violation is the one-booking-per-driver-per-day index.
+    """
+    return DRIVER_DAY_INDEX in str(exc.orig)
+
 # -------------------------------
 # Route WITHOUT package_id
 # -------------------------------
@@ -84,23 +109,54 @@ def manual_booking_create_page(
         }
     )
 
+# Shortest name / email fragment worth a trigram lookup
+MIN_TRIGRAM_SEARCH_LENGTH = 3
+
+
 @router.get("/customers/search", name="customer_search")
 def customer_search(
     q: str = Query(None, min_length=1),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    current_user=Depends(company_only),
 ):
+    q = (q or "").strip()
     if not q:
         return {"results": []}
 
+    # "+91 98765", "(555) 12" ... look like a phone number
+    digits = re.sub(r"\D", "", q) if re.fullmatch(r"[\d\s()+.-]+", q) else ""
+
+    # 🔍 phone by digit prefix (with or without the country code),
+    # otherwise name / email by trigram, most similar first
+    if digits:
+        match = or_(
+            Customer.phone_digits.startswith(digits),
+            Customer.phone.startswith(digits),
+        )
+        order_by = [func.length(Customer.phone_digits), Customer.guest_name]
+    else:
+        if len(q) >= MIN_TRIGRAM_SEARCH_LENGTH:
+            match = or_(
+                Customer.guest_name.icontains(q, autoescape=True),
+                Customer.email.icontains(q, autoescape=True),
+            )
+        else:
+            match = Customer.guest_name.istartswith(q, autoescape=True)
+
+        relevance = func.greatest(
+            func.similarity(Customer.guest_name, q),
+            func.similarity(func.coalesce(Customer.email, ""), q),
+        )
+        order_by = [relevance.desc(), Customer.guest_name]
+
     customers = (
         db.query(Customer)
         .filter(
-            or_(
-                Customer.guest_name.ilike(f"%{q}%"),
-                cast(Customer.phone, String).ilike(f"%{q}%"),
-                Customer.email.ilike(f"%{q}%")
-            )
+            Customer.company_id == current_user.company.id,
+            Customer.is_deleted == False,
+            match
         )
+        .order_by(*order_by)
         .limit(10)
         .all()
     )
@@ -168,25 +224,6 @@ def create_manual_booking(
         db.commit()
         db.refresh(customer)
 
-    # ✅ DRIVER CONFLICT CHECK
-    if driver_id:
-        conflict = (
-            db.query(ManualBooking)
-            .filter(
-                ManualBooking.driver_id == driver_id,
-                ManualBooking.travel_date == travel_date,
-                ManualBooking.is_deleted == False
-            )
-            .first()
-        )
-
-        if conflict:
-            return flash_redirect(
-                url=request.url_for("manual_booking_create"),
-                message="Selected driver is already booked for this date.",
-                category="error",
-            )
-
     remaining_amount = total_amount - advance_amount
 
     payment_status = (
@@ -196,6 +233,7 @@ def create_manual_booking(
     )
 
     booking = ManualBooking(
+        company_id=company.id,
         customer_id=customer.id,
         adults=adults,
         kids=kids,
@@ -211,45 +249,238 @@ def create_manual_booking(
     )
 
     db.add(booking)
-    db.commit()
-    db.refresh(booking)
 
-    # ✅ WhatsApp notification
+    # ✅ DRIVER CONFLICT CHECK (unique driver/day index); flushed before
+    # the rollup upsert, whose autoflush would raise outside this block
     try:
-        phone_number = format_phone(country_code, phone)
-        send_whatsapp_booking_confirmation(phone_number, booking)
-        send_whatsapp_driver_details(phone_number, booking)
-        
-    except Exception:
-        print(f"WhatsApp send failed for booking {booking.id}")
+        db.flush()
+        apply_booking_stats(db, booking_stats_delta(booking))
+
+        # ✅ WhatsApp notifications: queued in the booking transaction,
+        # sent by the outbox worker (app.seeds.whatsapp_outbox_worker)
+        booking = (
+            ManualBooking.query_for(db, "notification")
+            .filter(ManualBooking.id == booking.id)
+            .one()
+        )
+        enqueue_booking_notifications(db, booking, format_phone(country_code, phone))
+
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        if not is_driver_day_conflict(exc):
+            raise
+        return flash_redirect(
+            url=request.url_for("manual_booking_create"),
+            message="Selected driver is already booked for this date.",
+            category="error",
+        )
+    invalidate_availability(company.id)
 
     return flash_redirect(
         url=request.url_for("manual_booking_list"),
         message="Booking created successfully.",
     )
 
+# =================================================
+# AUTO-ASSIGN DRIVERS
+# =================================================
+@router.post("/auto-assign", name="manual_booking_auto_assign")
+def auto_assign_bookings(
+    request: Request,
+    travel_date: date = Form(...),
+    db: Session = Depends(get_db),
+    current_user=Depends(company_only),
+):
+    company_id = current_user.company.id
+
+    result = auto_assign_drivers(db, company_id, travel_date)
+
+    try:
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        if not is_driver_day_conflict(exc):
+            raise
+        return flash_redirect(
+            url=request.url_for("manual_booking_list"),
+            message="Drivers changed while assigning, please try again.",
+            category="error",
+        )
+    invalidate_availability(company_id)
+
+    if not result["assigned"] and not result["unassigned"]:
+        return flash_redirect(
+            url=request.url_for("manual_booking_list"),
+            message="No bookings without a driver on this date.",
+        )
+
+    message = f"Assigned drivers to {result['assigned']} booking(s)."
+    if result["unassigned"]:
+        message += f" {result['unassigned']} booking(s) have no free driver with enough seats."
+
+    return flash_redirect(
+        url=request.url_for("manual_booking_list"),
+        message=message,
+        category="success" if result["assigned"] else "error",
+    )
+
 # =================================================
 # DATATABLE API
 # =================================================
+DATATABLE_ORDER_COLUMNS = {
+    "id": ManualBooking.id,
+    "guest_details": Customer.guest_name,
+    "travel_details": ManualBooking.travel_date,
+    "payment_details": ManualBooking.total_amount,
+}
+
+# Compact (format=columns) payload; HTML is built by the column renderers
+DATATABLE_COLUMNS = {
+    "id": ManualBooking.id,
+    "guest_name": Customer.guest_name,
+    "country_code": Customer.country_code,
+    "phone": Customer.phone,
+    "email": Customer.email,
+    "adults": ManualBooking.adults,
+    "kids": ManualBooking.kids,
+    "package_title": TourPackage.title,
+    "travel_date": ManualBooking.travel_date,
+    "travel_time": ManualBooking.travel_time,
+    "pickup_location": ManualBooking.pickup_location,
+    "currency": TourPackage.currency,
+    "total_amount": ManualBooking.total_amount,
+    "advance_amount": ManualBooking.advance_amount,
+    "remaining_amount": ManualBooking.remaining_amount,
+    "payment_status": ManualBooking.payment_status,
+}
+
+
+def encode_booking_cursor(travel_date: date, booking_id: int) -> str:
+    return f"{travel_date.isoformat()}_{booking_id}"
+
+
+def decode_booking_cursor(cursor: Optional[str]):
+    try:
+        travel_date, booking_id = cursor.split("_", 1)
+        return date.fromisoformat(travel_date), int(booking_id)
+    except (AttributeError, ValueError):
+        return None
+
+
 @router.get("/datatable", name="manual_booking_datatable")
 def manual_booking_datatable(
     request: Request,
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    payment_status: Optional[str] = Query(None),
+    driver_id: Optional[int] = Query(None),
+    tour_package_id: Optional[int] = Query(None),
+    cursor: Optional[str] = Query(None),
+    fmt: str = Query("rows", alias="format", pattern="^(rows|columns)$"),
     db: Session = Depends(get_db),
     current_user=Depends(company_only),
 ):
-    bookings = (
-        db.query(ManualBooking)
+    """
+    DataTables serverSide endpoint. Only the visible page is loaded;
+    when ordered by travel date the client sends back `cursor` from the
+    previous page and we seek on (travel_date, id) instead of OFFSET.
+
+    `format=columns` returns typed column arrays instead of per-row HTML.
+    """
+    company = current_user.company
+    params = datatable_params(request)
+
+    query = (
+        ManualBooking.query_for(db, "list")
         .filter(
             ManualBooking.is_deleted == False,
-            ManualBooking.tour_package.has(
-                TourPackage.company_id == current_user.id
-            )
+            ManualBooking.company_id == company.id
         )
-        .order_by(ManualBooking.id.desc())
-        .all()
     )
-    
-    company = current_user.company
+
+    records_total = query.with_entities(func.count(ManualBooking.id)).scalar()
+
+    # 🔍 FILTERS
+    if date_from:
+        query = query.filter(ManualBooking.travel_date >= date_from)
+    if date_to:
+        query = query.filter(ManualBooking.travel_date <= date_to)
+    if payment_status:
+        query = query.filter(ManualBooking.payment_status == payment_status)
+    if driver_id:
+        query = query.filter(ManualBooking.driver_id == driver_id)
+    if tour_package_id:
+        query = query.filter(ManualBooking.tour_package_id == tour_package_id)
+
+    if params["search"]:
+        term = f"%{params['search']}%"
+        query = query.filter(
+            or_(
+                Customer.guest_name.ilike(term),
+                Customer.phone.ilike(term),
+                Customer.email.ilike(term),
+                TourPackage.title.ilike(term),
+                ManualBooking.pickup_location.ilike(term),
+            )
+        )
+
+    records_filtered = query.with_entities(func.count(ManualBooking.id)).scalar()
+
+    # ↕️ ORDERING (travel date + id is the keyset-able default)
+    order_key = params["order_column"]
+    if order_key not in DATATABLE_ORDER_COLUMNS:
+        order_key = "travel_details"
+    order_column = DATATABLE_ORDER_COLUMNS[order_key]
+    descending = params["order_dir"] == "desc"
+    use_keyset = order_key == "travel_details"
+
+    keyset = decode_booking_cursor(cursor) if use_keyset else None
+
+    if use_keyset:
+        query = query.order_by(
+            ManualBooking.travel_date.desc() if descending else ManualBooking.travel_date.asc(),
+            ManualBooking.id.desc() if descending else ManualBooking.id.asc(),
+        )
+    else:
+        query = query.order_by(
+            order_column.desc() if descending else order_column.asc(),
+            ManualBooking.id.desc(),
+        )
+
+    if keyset:
+        key = tuple_(ManualBooking.travel_date, ManualBooking.id)
+        query = query.filter(
+            key < tuple_(*keyset) if descending else key > tuple_(*keyset)
+        )
+    else:
+        query = query.offset(params["start"])
+
+    if fmt == "columns":
+        rows = (
+            query
+            .with_entities(*DATATABLE_COLUMNS.values())
+            .limit(params["length"])
+            .all()
+        )
+
+        next_cursor = None
+        if use_keyset and len(rows) == params["length"]:
+            next_cursor = encode_booking_cursor(rows[-1].travel_date, rows[-1].id)
+
+        return datatable_response(
+            params["draw"],
+            records_total,
+            records_filtered,
+            columns=columnar(rows, DATATABLE_COLUMNS),
+            urls={
+                "edit": url_template(request, "manual_booking_edit"),
+                "delete": url_template(request, "manual_booking_delete"),
+            },
+            next_cursor=next_cursor,
+        )
+
+    bookings = query.limit(params["length"]).all()
 
     edit_icon = "/static/assets/icon/edit.svg"
     trash_icon = "/static/assets/icon/trash.svg"
@@ -295,16 +526,53 @@ def manual_booking_datatable(
             """
         })
 
-    return JSONResponse({"data": data})
+    next_cursor = None
+    if use_keyset and len(bookings) == params["length"]:
+        next_cursor = encode_booking_cursor(bookings[-1].travel_date, bookings[-1].id)
+
+    return datatable_response(
+        params["draw"],
+        records_total,
+        records_filtered,
+        data=data,
+        next_cursor=next_cursor,
+    )
 
 @router.get("/", response_class=HTMLResponse, name="manual_booking_list")
 def manual_booking_list(
     request: Request,
-    _=Depends(company_only)
+    db: Session = Depends(get_db),
+    current_user=Depends(company_only),
 ):
+    company = current_user.company
+
+    packages = (
+        db.query(TourPackage)
+        .filter(
+            TourPackage.company_id == company.id,
+            TourPackage.is_deleted == False
+        )
+        .order_by(TourPackage.title)
+        .all()
+    )
+
+    drivers = (
+        db.query(Driver)
+        .filter(
+            Driver.company_id == company.id,
+            Driver.is_deleted == False
+        )
+        .order_by(Driver.name)
+        .all()
+    )
+
     return templates.TemplateResponse(
         "manual_booking/list.html",
-        {"request": request}
+        {
+            "request": request,
+            "packages": packages,
+            "drivers": drivers,
+        }
     )
 
 @router.get("/{booking_id}/edit", name="manual_booking_edit")
@@ -314,8 +582,15 @@ def edit_manual_booking(
     db: Session = Depends(get_db),
     current_user=Depends(company_only),
 ):
-    booking = db.query(ManualBooking).get(booking_id)
     company = current_user.company
+    booking = (
+        ManualBooking.query_for(db, "detail")
+        .filter(
+            ManualBooking.id == booking_id,
+            ManualBooking.company_id == company.id
+        )
+        .first()
+    )
 
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
@@ -326,33 +601,13 @@ def edit_manual_booking(
         .all()
     )
 
-    # 🔹 Drivers already booked on same date (except current booking)
-    booked_driver_ids = (
-        db.query(ManualBooking.driver_id)
-        .filter(
-            ManualBooking.travel_date == booking.travel_date,
-            ManualBooking.driver_id.isnot(None),
-            ManualBooking.id != booking.id,
-            ManualBooking.is_deleted == False
-        )
-        .all()
-    )
-    booked_driver_ids = [d[0] for d in booked_driver_ids]
-
-    # 🔹 Drivers assigned to selected package
-    drivers = (
-        db.query(Driver)
-        .join(TourPackageDriver, TourPackageDriver.driver_id == Driver.id)
-        .filter(
-            TourPackageDriver.tour_package_id == booking.tour_package_id,
-            Driver.company_id == company.id,
-            Driver.is_deleted == False,
-            or_(
-                ~Driver.id.in_(booked_driver_ids),
-                Driver.id == booking.driver_id
-            )
-        )
-        .all()
+    # 🔹 Package drivers free on the booking date (current booking ignored)
+    drivers = available_drivers(
+        db,
+        company.id,
+        booking.travel_date,
+        package_id=booking.tour_package_id,
+        exclude_booking_id=booking.id,
     )
 
     return templates.TemplateResponse(
@@ -389,7 +644,15 @@ def update_manual_booking(
 ):
 
     # 1️⃣ Fetch the booking first
-    booking = db.query(ManualBooking).get(booking_id)
+    company_id = current_user.company.id
+    booking = (
+        ManualBooking.query_for(db, "detail")
+        .filter(
+            ManualBooking.id == booking_id,
+            ManualBooking.company_id == company_id
+        )
+        .first()
+    )
     if not booking:
         return flash_redirect(
             url=request.url_for("manual_booking_list"),
@@ -397,9 +660,11 @@ def update_manual_booking(
             category="error"
         )
 
+    previous_stats = booking_stats_delta(booking, sign=-1)
+
     # 2️⃣ Update or create customer
     if booking.customer_id:
-        customer = db.query(Customer).get(booking.customer_id)
+        customer = booking.customer
         if customer:
             customer.guest_name = guest_name
             customer.country_code = country_code
@@ -433,29 +698,7 @@ def update_manual_booking(
     db.commit()
     db.refresh(customer)
 
-    # 3️⃣ Check driver conflict
-    if driver_id:
-        conflict = (
-            db.query(ManualBooking)
-            .filter(
-                ManualBooking.id != booking_id,
-                ManualBooking.driver_id == driver_id,
-                ManualBooking.travel_date == travel_date,
-                ManualBooking.is_deleted == False
-            )
-            .first()
-        )
-        if conflict:
-            return flash_redirect(
-                url=request.url_for(
-                    "manual_booking_edit",
-                    booking_id=booking_id
-                ),
-                message="Selected driver is already booked for this date.",
-                category="error",
-            )
-
-    # 4️⃣ Update booking fields
+    # 3️⃣ Update booking fields
     booking.adults = adults
     booking.kids = kids
     booking.tour_package_id = tour_package_id
@@ -473,7 +716,30 @@ def update_manual_booking(
         else "pending"
     )
 
-    db.commit()
+    # 4️⃣ Driver conflict is rejected by the unique driver/day index;
+    # flushed before the rollup upsert, whose autoflush would raise
+    # outside this block
+    try:
+        db.flush()
+        apply_booking_stats(
+            db,
+            previous_stats,
+            booking_stats_delta(booking)
+        )
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        if not is_driver_day_conflict(exc):
+            raise
+        return flash_redirect(
+            url=request.url_for(
+                "manual_booking_edit",
+                booking_id=booking_id
+            ),
+            message="Selected driver is already booked for this date.",
+            category="error",
+        )
+    invalidate_availability(company_id)
 
     return flash_redirect(
         url=request.url_for("manual_booking_list"),
@@ -488,9 +754,19 @@ def delete_manual_booking(
     db: Session = Depends(get_db),
     current_user=Depends(company_only),
 ):
-    booking = db.query(ManualBooking).get(booking_id)
+    booking = db.query(ManualBooking).filter(
+        ManualBooking.id == booking_id,
+        ManualBooking.company_id == current_user.company.id
+    ).first()
+
+    if not booking:
+        raise HTTPException(status_code=404, detail="Booking not found")
+
+    if not booking.is_deleted:
+        apply_booking_stats(db, booking_stats_delta(booking, sign=-1))
     db.delete(booking)
     db.commit()
+    invalidate_availability(current_user.company.id)
 
     return {"success": True}
 
@@ -515,6 +791,7 @@ def tour_package_availability_page(
     # 🔹 Fetch drivers with details
     drivers = (
         db.query(TourPackageDriver)
+        .options(joinedload(TourPackageDriver.driver))
         .filter(
             TourPackageDriver.tour_package_id == package.id
         )
@@ -542,108 +819,153 @@ def tour_package_availability_page(
         }
     )
 
+# Widest window one calendar request may ask for
+MAX_BOOKED_DATES_WINDOW_DAYS = 62
+
+
 @router.get("/booked-dates/{package_id}", name="get_booked_dates")
 def get_booked_dates(
+    request: Request,
     package_id: int,
-    db: Session = Depends(get_db)
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    pax: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user=Depends(company_only),
 ):
-    # 1️⃣ Total drivers assigned to package
-    total_drivers = (
-        db.query(TourPackageDriver)
-        .filter(TourPackageDriver.tour_package_id == package_id)
-        .count()
-    )
+    """
+    Bookings and per-date driver / seat availability for the window
+    [from, to) (defaults to the current month). With `pax`, dates where
+    no free driver can seat the party are reported as booked too.
+    """
+    company_id = current_user.company.id
 
-    # 2️⃣ All bookings (for display)
-    bookings = (
-        db.query(ManualBooking)
-        .filter(
-            ManualBooking.tour_package_id == package_id,
-            ManualBooking.is_deleted == False
-        )
-        .all()
+    if date_from is None:
+        date_from = date.today().replace(day=1)
+    if date_to is None:
+        date_to = (date_from.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+    if date_to <= date_from or (date_to - date_from).days > MAX_BOOKED_DATES_WINDOW_DAYS:
+        raise HTTPException(status_code=400, detail="Invalid date window")
+
+    # 0️⃣ Revalidation: everything below only reads these rows
+    etag, last_modified = validators(
+        db,
+        row_versions(
+            ManualBooking.updated_at,
+            ManualBooking.company_id == company_id,
+            ManualBooking.travel_date >= date_from,
+            ManualBooking.travel_date < date_to,
+        ),
+        row_versions(Driver.updated_at, Driver.company_id == company_id),
+        row_versions(TourPackageDriver.id, TourPackageDriver.tour_package_id == package_id),
+        row_versions(Customer.updated_at, Customer.company_id == company_id),
+        extra=(package_id, date_from, date_to, pax),
     )
+    unchanged = not_modified(request, etag, last_modified)
+    if unchanged:
+        return unchanged
 
-    bookings_data = []
-    for b in bookings:
-        bookings_data.append({
-            "id": b.id, 
-            "guest_name": b.customer.guest_name,
-            "pickup_location": b.pickup_location or "",
-            "travel_date": b.travel_date.strftime("%Y-%m-%d"),
-            "travel_time": b.travel_time or "",
-        })
+    # 1️⃣ Driver / seat capacity for every day of the window
+    seats = seat_availability(db, company_id, package_id, date_from, date_to)
 
-    # 3️⃣ Count bookings per date
-    booking_counts = (
+    # 2️⃣ Bookings in the window (for display)
+    rows = (
         db.query(
+            ManualBooking.id,
+            Customer.guest_name,
+            ManualBooking.pickup_location,
             ManualBooking.travel_date,
-            func.count(ManualBooking.id).label("count")
+            ManualBooking.travel_time,
         )
+        .outerjoin(Customer, ManualBooking.customer_id == Customer.id)
         .filter(
+            ManualBooking.company_id == company_id,
             ManualBooking.tour_package_id == package_id,
-            ManualBooking.is_deleted == False
+            ManualBooking.is_deleted == False,
+            ManualBooking.travel_date >= date_from,
+            ManualBooking.travel_date < date_to,
         )
-        .group_by(ManualBooking.travel_date)
+        .order_by(ManualBooking.travel_date, ManualBooking.id)
         .all()
     )
 
-    booked_dates = []
-    availability = {}
+    bookings_data = [
+        {
+            "id": booking_id,
+            "guest_name": guest_name or "",
+            "pickup_location": pickup_location or "",
+            "travel_date": travel_date.strftime("%Y-%m-%d"),
+            "travel_time": travel_time.isoformat() if travel_time else "",
+        }
+        for booking_id, guest_name, pickup_location, travel_date, travel_time in rows
+    ]
+
+    # 3️⃣ Remaining drivers / seats per date
+    day_strings = [
+        seats.day(i).strftime("%Y-%m-%d")
+        for i in range(len(seats.remaining_drivers))
+    ]
+    availability = dict(zip(day_strings, seats.remaining_drivers.tolist()))
+    remaining_seats = dict(zip(day_strings, seats.remaining_seats.tolist()))
+
+    # disable date only if full
+    booked_dates = [day_strings[i] for i in seats.full_days(pax).tolist()]
 
-    # 4️⃣ Calculate remaining drivers per date
-    for travel_date, count in booking_counts:
-        date_str = travel_date.strftime("%Y-%m-%d")
-        remaining = max(total_drivers - count, 0)
+    return with_validators(JSONResponse({
+        "from": date_from.isoformat(),
+        "to": date_to.isoformat(),
+        "booked_dates": booked_dates,       # used by calendar
+        "bookings": bookings_data,          # used by popup/list
+        "availability": availability,       # ✅ NEW
+        "remaining_seats": remaining_seats,
+        "total_drivers": seats.total_drivers,
+        "total_seats": seats.total_seats,
+    }), etag, last_modified)
 
-        availability[date_str] = remaining
+# Longest heatmap the operations calendar may request
+MAX_HEATMAP_DAYS = 180
 
-        # disable date only if full
-        if remaining == 0:
-            booked_dates.append(date_str)
 
-    return {
-        "booked_dates": booked_dates,   # used by calendar
-        "bookings": bookings_data,      # used by popup/list
-        "availability": availability,   # ✅ NEW
-        "total_drivers": total_drivers  # optional but useful
-    }
+@router.get("/availability-heatmap", name="availability_heatmap")
+def availability_heatmap(
+    request: Request,
+    date_from: Optional[date] = Query(None, alias="from"),
+    days: int = Query(90, ge=1, le=MAX_HEATMAP_DAYS),
+    db: Session = Depends(get_db),
+    current_user=Depends(company_only),
+):
+    """
+    Packages x dates matrix of remaining drivers / seats for all active
+    packages (row i = packages.id[i], column j = from + j days).
+    """
+    date_from = date_from or date.today()
+    heatmap = cached_package_heatmap(
+        db,
+        current_user.company.id,
+        date_from,
+        date_from + timedelta(days=days),
+    )
+
+    return cached_json_response(request, heatmap)
 
 @router.get("/available-drivers/{package_id}/{travel_date}")
 def get_available_drivers(
     package_id: int,
     travel_date: date,
+    pax: int = Query(0, ge=0),
     db: Session = Depends(get_db),
     current_user=Depends(company_only),
 ):
     company_id = current_user.company.id
 
-    # Step 1: Get drivers already booked on this date
-    booked_driver_ids = (
-        db.query(ManualBooking.driver_id)
-        .filter(
-            ManualBooking.travel_date == travel_date,
-            ManualBooking.driver_id.isnot(None),
-            ManualBooking.is_deleted == False
-        )
-        .all()
+    # Package drivers free on this date (not booked on any package),
+    # limited to vehicles that seat `pax` when given
+    drivers = available_drivers(
+        db, company_id, travel_date, package_id=package_id, pax=pax
     )
-    booked_driver_ids = [d[0] for d in booked_driver_ids]
 
-    # Step 2: Get drivers assigned to this package and company
-    drivers = (
-        db.query(Driver)
-        .join(TourPackageDriver, TourPackageDriver.driver_id == Driver.id)
-        .filter(
-            TourPackageDriver.tour_package_id == package_id,
-            Driver.company_id == company_id,
-            Driver.is_deleted == False,
-            ~Driver.id.in_(booked_driver_ids)
-        )
-        .all()
-    )
-
-    # Step 3: Return only the available drivers
+    # Return only the available drivers
     return [
         {
             "id": d.id,
@@ -666,35 +988,8 @@ def get_all_package_drivers(
 ):
     company_id = current_user.company.id
 
-    # 1️⃣ Drivers already booked on this date (ANY package)
-    booked_driver_ids = (
-        db.query(ManualBooking.driver_id)
-        .filter(
-            ManualBooking.travel_date == travel_date,
-            ManualBooking.driver_id.isnot(None),
-            ManualBooking.is_deleted == False
-        )
-        .all()
-    )
-    booked_driver_ids = [d[0] for d in booked_driver_ids]
-
-    # 2️⃣ All drivers of company
-    #    - assigned to any package OR no package
-    #    - NOT booked on that date
-    drivers = (
-        db.query(Driver)
-        .outerjoin(
-            TourPackageDriver,
-            TourPackageDriver.driver_id == Driver.id
-        )
-        .filter(
-            Driver.company_id == company_id,
-            Driver.is_deleted == False,
-            ~Driver.id.in_(booked_driver_ids)
-        )
-        .distinct()
-        .all()
-    )
+    # All company drivers NOT booked on that date (any package)
+    drivers = available_drivers(db, company_id, travel_date)
 
     return [
         {
@@ -713,10 +1008,12 @@ def get_all_package_drivers(
 def booking_detail(
     booking_id: int,
     request: Request,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    current_user=Depends(company_only),
 ):
-    booking = db.query(ManualBooking).filter(
+    booking = ManualBooking.query_for(db, "detail").filter(
         ManualBooking.id == booking_id,
+        ManualBooking.company_id == current_user.company.id,
         ManualBooking.is_deleted == False
     ).first()
 
@@ -1,29 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, Form, UploadFile, File
 from fastapi.responses import HTMLResponse, RedirectResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from pydantic import ValidationError
 from typing import List, Optional
-from uuid import uuid4
-import os
 from datetime import date
-from sqlalchemy import or_
+from decimal import Decimal
+from sqlalchemy import or_, tuple_
 from app.database.session import get_db
 from app.core.templates import templates
 from app.auth.dependencies import company_only, get_current_user
 from app.utils.pagination import paginate
-from app.models.tour_package import TourPackage, TourPackageGalleryImage, TourPackageDriver
+from app.models.tour_package import SEARCH_RANK_SCALE, TourPackage, TourPackageGalleryImage, TourPackageDriver
 from app.schemas.tour_package import TourPackageCreate, TourPackageUpdate
 from sqlalchemy import or_
 from app.models.driver import Driver
 from app.core.constants import COUNTRIES, CURRENCIES
 from app.utils.flash import flash_redirect
+from app.utils.file_upload import save_uploads, UploadRejected
+from app.utils.page_cache import cached_page, store_page, bump_page_versions
+from app.utils.http_cache import row_versions, validators, not_modified, with_validators
+from app.services.availability_service import invalidate_availability
+from app.services.image_service import process_gallery_images
 from app.models.manual_booking import ManualBooking
 
 router = APIRouter(prefix="/tour-packages", tags=["Tour Packages"])
 
-UPLOAD_DIR = "app/static/uploads/tours"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
 def render_form(request: Request, *, package=None, form=None, errors=None, status_code=200):
     return templates.TemplateResponse(
         "tour_packages/form.html",
@@ -55,22 +56,20 @@ def my_tour_list(
         TourPackage.is_deleted == False
     )
 
-    # 🔍 SEARCH FILTER
+    # 🔍 SEARCH FILTER (full-text, most relevant first)
+    order_by = [TourPackage.id.desc()]
     if search:
-        query = query.filter(
-            or_(
-                TourPackage.title.ilike(f"%{search}%"),
-                TourPackage.city.ilike(f"%{search}%"),
-                TourPackage.country.ilike(f"%{search}%"),
-            )
-        )
+        query, rank = TourPackage.search(query, search)
+        order_by.insert(0, rank.desc())
 
     # 📅 AVAILABILITY FILTER (IMPORTANT)
     if travel_date:
         booked_subquery = (
             db.query(ManualBooking.tour_package_id)
             .filter(
-                ManualBooking.travel_date == travel_date
+                ManualBooking.company_id == company.id,
+                ManualBooking.travel_date == travel_date,
+                ManualBooking.is_deleted == False
                 )
             .subquery()
         )
@@ -80,7 +79,7 @@ def my_tour_list(
         )
 
     pagination = paginate(
-        query.order_by(TourPackage.id.desc()),
+        query.order_by(*order_by),
         page
     )
 
@@ -164,7 +163,21 @@ def create_package(
     except ValidationError as e:
         errors = {err["loc"][0]: err["msg"] for err in e.errors()}
         return render_form(request, form=form_data, errors=errors, countries=COUNTRIES, status_code=400)
-    # Save cover image
+
+    # Save cover + gallery images (streamed, written concurrently)
+    uploads = [cover_image] + [
+        img for img in gallery_images or []
+        if img.content_type.startswith("image/")
+    ]
+    try:
+        cover_path, *gallery_paths = save_uploads(uploads, "tour_image")
+    except UploadRejected as e:
+        return flash_redirect(
+            url=request.url_for("tour_package_create_page"),
+            message=str(e),
+            category="error"
+        )
+
     package = TourPackage(
     company_id=current_user.company.id,
     **validated.dict()
@@ -172,29 +185,27 @@ def create_package(
     db.add(package)
     db.flush()
     
-    cover_path = save_image(cover_image)
-    db.add(
+    package.cover_image_path = cover_path
+    new_images = [
         TourPackageGalleryImage(
             tour_package_id=package.id,
             image_path=cover_path,
             image_type="cover"
         )
-    )
+    ]
     
-    if gallery_images:
-        for img in gallery_images:
-            if not img.content_type.startswith("image/"):
-                continue
-
-            db.add(
-                TourPackageGalleryImage(
-                    tour_package_id=package.id,
-                    image_path=save_image(img),
-                    image_type="gallery"
-                )
+    for path in gallery_paths:
+        new_images.append(
+            TourPackageGalleryImage(
+                tour_package_id=package.id,
+                image_path=path,
+                image_type="gallery"
             )
+        )
 
+    db.add_all(new_images)
     db.commit()
+    process_gallery_images(new_images)
 
     for driver_id in driver_ids:
         db.add(
@@ -205,6 +216,8 @@ def create_package(
         )
 
     db.commit()
+    invalidate_availability(package.company_id)
+    bump_page_versions("catalog")
 
     return flash_redirect(
         url=request.url_for("my_tour_list"),
@@ -285,6 +298,21 @@ def update_package(
             status_code=303
         )
 
+    cover_upload = cover_image if cover_image and cover_image.content_type.startswith("image/") else None
+    uploads = ([cover_upload] if cover_upload else []) + [
+        img for img in gallery_images or []
+        if img and img.content_type.startswith("image/")
+    ]
+    try:
+        paths = save_uploads(uploads, "tour_image")
+    except UploadRejected as e:
+        return flash_redirect(
+            url=request.url_for("tour_package_edit_page", package_id=package.id),
+            message=str(e),
+            category="error"
+        )
+    cover_path = paths.pop(0) if cover_upload else None
+
     update_data = TourPackageUpdate(
         title=title,
         description=description,
@@ -300,7 +328,8 @@ def update_package(
     for field, value in update_data.dict().items():
         setattr(package, field, value)
 
-    if cover_image and cover_image.content_type.startswith("image/"):
+    new_images = []
+    if cover_path:
 
         # Find existing cover
         old_cover = db.query(TourPackageGalleryImage).filter(
@@ -308,33 +337,33 @@ def update_package(
             TourPackageGalleryImage.image_type == "cover"
         ).first()
 
-        # Delete old cover record
+        # Delete old cover record; its blob is reclaimed by the upload GC
+        # once nothing references it
         if old_cover:
-            # OPTIONAL: delete file from disk
-            # delete_file(old_cover.image_path)
-
             db.delete(old_cover)
             db.flush()
 
         # Save new cover
         new_cover = TourPackageGalleryImage(
             tour_package_id=package.id,
-            image_path=save_image(cover_image),
+            image_path=cover_path,
             image_type="cover"
         )
-        db.add(new_cover)
-
-    if gallery_images:
-        for img in gallery_images:
-            if img and img.content_type.startswith("image/"):
-                db.add(
-                    TourPackageGalleryImage(
-                        tour_package_id=package.id,
-                        image_path=save_image(img),
-                        image_type="gallery"
-                    )
-                )
+        new_images.append(new_cover)
+        package.cover_image_path = new_cover.image_path
+        package.cover_image_variants = None
+
+    for path in paths:
+        new_images.append(
+            TourPackageGalleryImage(
+                tour_package_id=package.id,
+                image_path=path,
+                image_type="gallery"
+            )
+        )
+    db.add_all(new_images)
     db.commit()
+    process_gallery_images(new_images)
 
     # Update drivers
     db.query(TourPackageDriver).filter(
@@ -350,6 +379,8 @@ def update_package(
         )
 
     db.commit()
+    invalidate_availability(package.company_id)
+    bump_page_versions("catalog", f"package:{package.id}")
 
     return flash_redirect(
         url=request.url_for("my_tour_list"),
@@ -371,28 +402,51 @@ def delete_package(
     if package:
         package.is_deleted = True
         db.commit()
+        invalidate_availability(package.company_id)
+        bump_page_versions("catalog", f"package:{package.id}")
 
     return flash_redirect(
         url=request.url_for("my_tour_list"),
         message="Tour Package deleted successfully"
     )
 
-def save_image(file: UploadFile) -> str:
-    filename = f"{uuid4().hex}_{file.filename.replace(' ', '_')}"
-    path = f"{UPLOAD_DIR}/{filename}"
+PUBLIC_TOURS_PER_PAGE = 24
+
 
-    with open(path, "wb") as f:
-        f.write(file.file.read())
+def decode_tour_cursor(cursor: str | None):
+    """
+    "<id>" when browsing, "<rank>_<id>" when searching; None if invalid.
+    """
+    if not cursor:
+        return None
+    try:
+        if "_" in cursor:
+            rank, tour_id = cursor.split("_", 1)
+            rank = Decimal(rank)
+            if not rank.is_finite():
+                return None
+            # same scale as the rank column (raises for huge exponents)
+            return rank.quantize(Decimal(1).scaleb(-SEARCH_RANK_SCALE)), int(tour_id)
+        return (int(cursor),)
+    except (ValueError, ArithmeticError):
+        return None
 
-    return path.replace("app/static/", "")
 
 @router.get("/tours", name="public_tour_list")
 def public_tour_list(
     request: Request,
     db: Session = Depends(get_db),
     search: str = "",
-    travel_date: str | None = None
+    travel_date: str | None = None,
+    cursor: str | None = None
 ):
+    # 🗄️ Rendered page cache (availability by date depends on bookings)
+    cache_key = None
+    if not travel_date:
+        cache_key, cached = cached_page(request, "catalog")
+        if cached:
+            return cached
+
     query = (
         db.query(TourPackage)
         .filter(
@@ -401,12 +455,11 @@ def public_tour_list(
         )
     )
 
+    # 🔍 Full-text search, most relevant first
+    rank = None
+    search = search.strip()
     if search:
-        query = query.filter(
-            TourPackage.title.ilike(f"%{search}%") |
-            TourPackage.city.ilike(f"%{search}%") |
-            TourPackage.country.ilike(f"%{search}%")
-        )
+        query, rank = TourPackage.search(query, search)
 
     if travel_date:
         booked_subquery = (
@@ -419,17 +472,57 @@ def public_tour_list(
             TourPackage.id.notin_(booked_subquery)
         )
 
-    tours = query.order_by(TourPackage.id.desc()).all()
+    # 🔁 Keyset page: cards after the last one already shown
+    position = decode_tour_cursor(cursor)
+    if rank is not None:
+        if position and len(position) == 2:
+            query = query.filter(tuple_(rank, TourPackage.id) < position)
+        query = query.add_columns(rank).order_by(rank.desc(), TourPackage.id.desc())
+    else:
+        if position and len(position) == 1:
+            query = query.filter(TourPackage.id < position[0])
+        query = query.order_by(TourPackage.id.desc())
+
+    rows = (
+        query
+        .options(
+            selectinload(
+                TourPackage.gallery_images.and_(
+                    TourPackageGalleryImage.image_type == "gallery"
+                )
+            )
+        )
+        .limit(PUBLIC_TOURS_PER_PAGE + 1)
+        .all()
+    )
 
-    return templates.TemplateResponse(
-        "tour_packages/public_list.html",
+    next_cursor = None
+    if len(rows) > PUBLIC_TOURS_PER_PAGE:
+        rows = rows[:PUBLIC_TOURS_PER_PAGE]
+        last = rows[-1]
+        next_cursor = (
+            f"{last[1]}_{last[0].id}" if rank is not None else str(last.id)
+        )
+
+    tours = [row[0] for row in rows] if rank is not None else rows
+
+    template = (
+        "tour_packages/_public_cards.html"
+        if request.headers.get("X-Requested-With") == "XMLHttpRequest"
+        else "tour_packages/public_list.html"
+    )
+
+    return store_page(cache_key, templates.TemplateResponse(
+        template,
         {
             "request": request,
             "tours": tours,
+            "cursor": cursor,
+            "next_cursor": next_cursor,
             "search": search,
             "travel_date": travel_date,
         }
-    )
+    ))
     
 @router.post("/gallery-image/{image_id}/delete", name="delete_gallery_image")
 def delete_gallery_image(
@@ -447,13 +540,16 @@ def delete_gallery_image(
     if not image:
         raise HTTPException(status_code=404, detail="Image not found")
 
-    # delete file from disk (optional but recommended)
-    file_path = f"static/{image.image_path}"
-    if os.path.exists(file_path):
-        os.remove(file_path)
+    # the file (shared by identical uploads) is removed by the upload GC
+    # once nothing references it
+    if image.image_type == "cover":
+        image.tour_package.cover_image_path = None
+        image.tour_package.cover_image_variants = None
 
+    package_id = image.tour_package_id
     db.delete(image)
     db.commit()
+    bump_page_versions("catalog", f"package:{package_id}")
 
     return {"success": True}
 
@@ -463,6 +559,23 @@ def tour_detail(
     request: Request,
     db: Session = Depends(get_db)
 ):
+    # a hit answers If-None-Match from the stored ETag, without the DB
+    cache_key, cached = cached_page(request, f"package:{slug}")
+    if cached:
+        return cached
+
+    etag = last_modified = None
+    if cache_key is not None:
+        etag, last_modified = validators(
+            db,
+            row_versions(TourPackage.updated_at, TourPackage.id == slug),
+            row_versions(TourPackageGalleryImage.id, TourPackageGalleryImage.tour_package_id == slug),
+            extra=(str(request.url),),
+        )
+        unchanged = not_modified(request, etag, last_modified)
+        if unchanged:
+            return unchanged
+
     tour = db.query(TourPackage)\
         .filter(
             TourPackage.id == slug,
@@ -474,10 +587,14 @@ def tour_detail(
     if not tour:
         raise HTTPException(status_code=404, detail="Tour not found")
 
-    return templates.TemplateResponse(
+    response = templates.TemplateResponse(
         "tour_packages/public_tour_detail.html",
         {
             "request": request,
             "tour": tour
         }
     )
+    if etag is not None:
+        with_validators(response, etag, last_modified)
+
+    return store_page(cache_key, response)
@@ -0,0 +1,148 @@
+import argparse
+import asyncio
+import time
+
+from aiosmtpd.controller import Controller
+
+from app.core.email import conf
+from app.services.email_delivery_service import (
+    EMAIL_BATCH_SIZE, EMAIL_POOL_SIZE, EmailDelivery, SMTPConnection, render_email
+)
+
+
+class SlowSMTPHandler:
+    """
+    aiosmtpd handler counting sessions and messages; sleeps to stand in
+    for a remote server's handshake and per-message latency.
+    """
+
+    def __init__(self, handshake_seconds: float, message_seconds: float):
+        self.handshake_seconds = handshake_seconds
+        self.message_seconds = message_seconds
+        self.sessions = 0
+        self.messages = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        await asyncio.sleep(self.handshake_seconds)
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.message_seconds)
+        self.messages += 1
+        return "250 OK"
+
+
+def benchmark_messages(count: int) -> list:
+    return [
+        render_email(
+            to=f"user{i}@example.com",
+            subject="Reset Your Password",
+            template_name="reset_password.html",
+            context={"email": f"user{i}@example.com", "reset_url": f"https://example.com/reset?token={i}"},
+        )
+        for i in range(count)
+    ]
+
+
+async def send_per_message(messages: list, connections: int, **connection) -> None:
+    """
+    The old way: a new SMTP session for every message, `connections` at once.
+    """
+    limit = asyncio.Semaphore(connections)
+
+    async def send(message):
+        async with limit:
+            smtp = SMTPConnection(**connection)
+            try:
+                await smtp.send(message)
+            finally:
+                await smtp.close()
+
+    await asyncio.gather(*(send(message) for message in messages))
+
+
+async def send_pooled(messages: list, connections: int, batch_size: int, **connection) -> None:
+    delivery = EmailDelivery(pool_size=connections, batch_size=batch_size, **connection)
+    await asyncio.gather(*(delivery.send(message) for message in messages))
+    await delivery.close()
+
+
+def benchmark(
+    messages: int = 300,
+    connections: int = EMAIL_POOL_SIZE,
+    batch_size: int = EMAIL_BATCH_SIZE,
+    handshake_ms: float = 50,
+    message_ms: float = 2,
+    port: int = 8025,
+) -> dict:
+    """
+    Send `messages` emails to a local aiosmtpd server once with one SMTP
+    session per message and once through EmailDelivery, both over
+    `connections` parallel connections. Returns {mode: {"seconds",
+    "msgs_per_s", "sessions", "received"}}.
+    """
+    handler = SlowSMTPHandler(handshake_ms / 1000, message_ms / 1000)
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    connection = {"hostname": "127.0.0.1", "port": port}
+    emails = benchmark_messages(messages)
+
+    # plain SMTP, no login: what the local server speaks
+    settings = {"MAIL_STARTTLS": False, "MAIL_SSL_TLS": False, "USE_CREDENTIALS": False}
+    saved = {name: getattr(conf, name) for name in settings}
+    for name, value in settings.items():
+        setattr(conf, name, value)
+
+    controller.start()
+    results = {}
+    try:
+        for mode, send in (
+            ("per-message", lambda: send_per_message(emails, connections, **connection)),
+            ("pooled", lambda: send_pooled(emails, connections, batch_size, **connection)),
+        ):
+            sessions, received = handler.sessions, handler.messages
+            started = time.perf_counter()
+            asyncio.run(send())
+            seconds = time.perf_counter() - started
+            results[mode] = {
+                "seconds": seconds,
+                "msgs_per_s": messages / seconds,
+                "sessions": handler.sessions - sessions,
+                "received": handler.messages - received,
+            }
+    finally:
+        controller.stop()
+        for name, value in saved.items():
+            setattr(conf, name, value)
+
+    return results
+
+
+def run(messages: int = 300, connections: int = EMAIL_POOL_SIZE, handshake_ms: float = 50, message_ms: float = 2, port: int = 8025):
+    results = benchmark(messages, connections, handshake_ms=handshake_ms, message_ms=message_ms, port=port)
+
+    for mode, result in results.items():
+        print(
+            f"{mode:>12}: {result['msgs_per_s']:7.1f} msgs/s "
+            f"({result['received']} messages in {result['seconds']:.2f} s, {result['sessions']} SMTP sessions)"
+        )
+    speedup = results["pooled"]["msgs_per_s"] / results["per-message"]["msgs_per_s"]
+    print(f"✅ pooled delivery: {speedup:.1f}x the throughput of one connection per message")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare pooled and per-message SMTP delivery against a local aiosmtpd server")
+    parser.add_argument("--messages", type=int, default=300)
+    parser.add_argument("--connections", type=int, default=EMAIL_POOL_SIZE, help="parallel SMTP connections in both modes")
+    parser.add_argument("--handshake-ms", type=float, default=50, help="simulated connect + EHLO latency")
+    parser.add_argument("--message-ms", type=float, default=2, help="simulated per-message latency")
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args()
+
+    run(
+        messages=args.messages,
+        connections=args.connections,
+        handshake_ms=args.handshake_ms,
+        message_ms=args.message_ms,
+        port=args.port,
+    )
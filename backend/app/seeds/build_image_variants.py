@@ -0,0 +1,42 @@
+from sqlalchemy.orm import Session
+from app.database.session import SessionLocal
+from app.models.tour_package import TourPackageGalleryImage
+from app.services.image_service import get_image_pool, store_image_variants
+from app.utils.image_variants import render_image_variants
+
+
+def run():
+    """
+    Render thumb / card / full variants for uploads made before the
+    image pipeline existed.
+    """
+    db: Session = SessionLocal()
+
+    try:
+        images = (
+            db.query(TourPackageGalleryImage.id, TourPackageGalleryImage.image_path)
+            .filter(TourPackageGalleryImage.variants.is_(None))
+            .all()
+        )
+    finally:
+        db.close()
+
+    pool = get_image_pool()
+    futures = [
+        (image_id, image_path, pool.submit(render_image_variants, image_path))
+        for image_id, image_path in images
+    ]
+
+    done = failed = 0
+    for image_id, image_path, future in futures:
+        try:
+            store_image_variants(image_id, image_path, future.result())
+            done += 1
+        except Exception as exc:
+            failed += 1
+            print(f"⚠️ {image_path}: {exc}")
+
+    print(f"✅ image variants built for {done} images ({failed} failed)")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,10 @@
+from app.utils.static_assets import build_static_assets, BUILD_DIR
+
+
+def run():
+    manifest = build_static_assets()
+
+    print(f"✅ {len(manifest)} static assets fingerprinted into {BUILD_DIR}")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,29 @@
+import argparse
+
+from sqlalchemy.orm import Session
+from app.database.session import SessionLocal
+from app.services.upload_gc_service import collect_orphan_uploads, GC_GRACE_SECONDS, GC_BATCH_SIZE
+
+
+def run(dry_run: bool = False, grace_seconds: int = GC_GRACE_SECONDS, batch_size: int = GC_BATCH_SIZE):
+    db: Session = SessionLocal()
+
+    try:
+        stats = collect_orphan_uploads(db, grace_seconds=grace_seconds, batch_size=batch_size, dry_run=dry_run)
+    finally:
+        db.close()
+
+    action = "would delete" if dry_run else "deleted"
+    print(
+        f"✅ upload GC: scanned {stats['scanned']} files, {stats['referenced']} referenced, "
+        f"{action} {stats['deleted']} ({stats['bytes']} bytes)"
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delete upload files no row references")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--grace", type=int, default=GC_GRACE_SECONDS, help="skip files younger than this (seconds)")
+    parser.add_argument("--batch-size", type=int, default=GC_BATCH_SIZE)
+    args = parser.parse_args()
+
+    run(dry_run=args.dry_run, grace_seconds=args.grace, batch_size=args.batch_size)
@@ -0,0 +1,17 @@
+from sqlalchemy.orm import Session
+from app.database.session import SessionLocal
+from app.services.booking_stats_service import rebuild_booking_daily_stats
+
+
+def run():
+    db: Session = SessionLocal()
+
+    try:
+        rows = rebuild_booking_daily_stats(db)
+    finally:
+        db.close()
+
+    print(f"✅ booking_daily_stats rebuilt ({rows} rows)")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,24 @@
+import argparse
+import asyncio
+import logging
+
+from app.services.whatsapp_service import WHATSAPP_API_URL
+from app.services.whatsapp_outbox_service import run_outbox_worker, OUTBOX_BATCH_SIZE, WHATSAPP_CONCURRENCY
+
+
+def run(once: bool = False, api_url: str = WHATSAPP_API_URL, batch_size: int = OUTBOX_BATCH_SIZE, concurrency: int = WHATSAPP_CONCURRENCY):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    total = asyncio.run(run_outbox_worker(once=once, api_url=api_url, batch_size=batch_size, concurrency=concurrency))
+
+    print(f"✅ WhatsApp outbox drained: {total} messages attempted")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Send queued WhatsApp notifications")
+    parser.add_argument("--once", action="store_true", help="exit when nothing is due instead of polling")
+    parser.add_argument("--api-url", default=WHATSAPP_API_URL, help="Graph API base URL (e.g. a local fake server)")
+    parser.add_argument("--batch-size", type=int, default=OUTBOX_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=WHATSAPP_CONCURRENCY)
+    args = parser.parse_args()
+
+    run(once=args.once, api_url=args.api_url, batch_size=args.batch_size, concurrency=args.concurrency)
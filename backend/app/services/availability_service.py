@@ -0,0 +1,337 @@
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import and_, case, exists, func, or_
+from sqlalchemy.orm import Session
+
+from app.models.driver import Driver
+from app.models.manual_booking import ManualBooking
+from app.models.tour_package import TourPackage, TourPackageDriver
+
+# Heatmaps are dropped on every booking / package / driver change of the
+# company; the TTL only bounds staleness across worker processes.
+HEATMAP_CACHE_TTL = 300
+HEATMAP_CACHE_SIZE = 256
+
+_heatmap_cache = {}
+_heatmap_versions = {}
+_heatmap_lock = threading.Lock()
+
+
+class SeatAvailability:
+    """
+    Driver / seat availability of one package over [date_from, date_to).
+
+    free[day, i]          – driver i has no booking that day (any package)
+    remaining_drivers[day] – free drivers minus package bookings still
+                             waiting for a driver
+    remaining_seats[day]   – seats of the free drivers minus the pax of
+                             those unassigned bookings
+    package_bookings[day]  – live bookings of the package that day
+
+    Drivers without a seat count contribute no seats but are never ruled
+    out by party size.
+    """
+
+    def __init__(self, date_from: date, drivers, free, remaining_drivers, remaining_seats, package_bookings):
+        self.date_from = date_from
+        self.drivers = drivers
+        self.free = free
+        self.remaining_drivers = remaining_drivers
+        self.remaining_seats = remaining_seats
+        self.package_bookings = package_bookings
+
+    @property
+    def total_drivers(self) -> int:
+        return len(self.drivers)
+
+    @property
+    def total_seats(self) -> int:
+        return sum(d.seats or 0 for d in self.drivers)
+
+    def day(self, index: int) -> date:
+        return self.date_from + timedelta(days=index)
+
+    def full_days(self, pax: int = 0) -> np.ndarray:
+        """
+        Day indexes on which a new booking of `pax` people cannot be placed.
+        A package without drivers has no capacity to measure; as before,
+        only days that already have one of its bookings are blocked.
+        """
+        if not self.drivers:
+            return np.flatnonzero(self.package_bookings > 0)
+
+        full = self.remaining_drivers <= 0
+        if pax:
+            seats = np.array([d.seats if d.seats is not None else pax for d in self.drivers], dtype=np.int64)
+            fits = self.free & (seats >= pax)
+            full |= ~fits.any(axis=1)
+        return np.flatnonzero(full)
+
+
+def available_drivers(
+    db: Session,
+    company_id: int,
+    travel_date: date,
+    package_id: int = None,
+    pax: int = 0,
+    exclude_booking_id: int = None,
+) -> list:
+    """
+    Company drivers with no live booking on travel_date, optionally only
+    the package's drivers and those seating `pax`. The booked check is a
+    NOT EXISTS anti-join served by the driver/day unique index;
+    exclude_booking_id ignores the booking being edited.
+    """
+    booked = exists().where(
+        ManualBooking.driver_id == Driver.id,
+        ManualBooking.company_id == company_id,
+        ManualBooking.travel_date == travel_date,
+        ManualBooking.is_deleted == False
+    )
+    if exclude_booking_id is not None:
+        booked = booked.where(ManualBooking.id != exclude_booking_id)
+
+    query = (
+        db.query(Driver)
+        .filter(
+            Driver.company_id == company_id,
+            Driver.is_deleted == False,
+            ~booked
+        )
+    )
+
+    if package_id is not None:
+        query = (
+            query
+            .join(TourPackageDriver, TourPackageDriver.driver_id == Driver.id)
+            .filter(TourPackageDriver.tour_package_id == package_id)
+        )
+
+    if pax:
+        query = query.filter(or_(Driver.seats.is_(None), Driver.seats >= pax))
+
+    return query.order_by(Driver.id).all()
+
+
+def seat_availability(
+    db: Session,
+    company_id: int,
+    package_id: int,
+    date_from: date,
+    date_to: date,
+) -> SeatAvailability:
+    """
+    Load the package's drivers and the bookings that touch them in the
+    range once (two queries), then compute every day with array maths;
+    365 days cost about the same as one.
+    """
+    days = max((date_to - date_from).days, 0)
+
+    drivers = (
+        db.query(Driver)
+        .join(TourPackageDriver, TourPackageDriver.driver_id == Driver.id)
+        .filter(
+            TourPackageDriver.tour_package_id == package_id,
+            Driver.company_id == company_id,
+            Driver.is_deleted == False
+        )
+        .order_by(Driver.id)
+        .all()
+    )
+    driver_ids = np.array([d.id for d in drivers], dtype=np.int64)
+    seats = np.array([d.seats or 0 for d in drivers], dtype=np.int64)
+
+    # Bookings holding one of these drivers (any package), plus all of
+    # this package's bookings (those without a driver are still waiting)
+    rows = (
+        db.query(
+            ManualBooking.travel_date,
+            ManualBooking.driver_id,
+            ManualBooking.tour_package_id,
+            ManualBooking.adults,
+            ManualBooking.kids,
+        )
+        .filter(
+            ManualBooking.company_id == company_id,
+            ManualBooking.is_deleted == False,
+            ManualBooking.travel_date >= date_from,
+            ManualBooking.travel_date < date_to,
+            or_(
+                ManualBooking.driver_id.in_(driver_ids.tolist()),
+                ManualBooking.tour_package_id == package_id,
+            ),
+        )
+        .all()
+    )
+
+    day_index = np.array([(r.travel_date - date_from).days for r in rows], dtype=np.int64)
+    booked_driver = np.array([r.driver_id or 0 for r in rows], dtype=np.int64)
+    of_package = np.array([r.tour_package_id == package_id for r in rows], dtype=bool)
+    pax = np.array([(r.adults or 0) + (r.kids or 0) for r in rows], dtype=np.int64)
+
+    # days x drivers occupancy (package bookings may hold another driver)
+    booked = np.zeros((days, len(drivers)), dtype=bool)
+    holds = np.isin(booked_driver, driver_ids)
+    booked[day_index[holds], np.searchsorted(driver_ids, booked_driver[holds])] = True
+    free = ~booked
+
+    # only package rows come back without a driver
+    waiting = booked_driver == 0
+    waiting_bookings = np.bincount(day_index[waiting], minlength=days)
+    waiting_pax = np.bincount(day_index[waiting], weights=pax[waiting], minlength=days).astype(np.int64)
+
+    remaining_drivers = np.maximum(free.sum(axis=1) - waiting_bookings, 0)
+    remaining_seats = np.maximum(free @ seats - waiting_pax, 0)
+
+    return SeatAvailability(
+        date_from,
+        drivers,
+        free,
+        remaining_drivers,
+        remaining_seats,
+        np.bincount(day_index[of_package], minlength=days),
+    )
+
+
+def package_heatmap(
+    db: Session,
+    company_id: int,
+    date_from: date,
+    date_to: date,
+) -> dict:
+    """
+    Remaining drivers / seats of every active package of a company, one
+    row per package and one column per day of [date_from, date_to).
+    """
+    days = max((date_to - date_from).days, 0)
+
+    # 1️⃣ Active packages with their (non-deleted) drivers
+    links = (
+        db.query(TourPackage.id, TourPackage.title, Driver.id, Driver.seats)
+        .outerjoin(TourPackageDriver, TourPackageDriver.tour_package_id == TourPackage.id)
+        .outerjoin(
+            Driver,
+            and_(
+                Driver.id == TourPackageDriver.driver_id,
+                Driver.company_id == company_id,
+                Driver.is_deleted == False
+            )
+        )
+        .filter(
+            TourPackage.company_id == company_id,
+            TourPackage.status == "active",
+            TourPackage.is_deleted == False
+        )
+        .order_by(TourPackage.title, TourPackage.id)
+        .all()
+    )
+
+    package_index, titles = {}, []
+    driver_index, seats = {}, []
+    for package_id, title, driver_id, driver_seats in links:
+        if package_id not in package_index:
+            package_index[package_id] = len(titles)
+            titles.append(title)
+        if driver_id is not None and driver_id not in driver_index:
+            driver_index[driver_id] = len(seats)
+            seats.append(driver_seats or 0)
+
+    link = np.zeros((len(titles), len(seats)), dtype=np.int64)
+    for package_id, _, driver_id, _ in links:
+        if driver_id is not None:
+            link[package_index[package_id], driver_index[driver_id]] = 1
+    seats = np.array(seats, dtype=np.int64)
+
+    # 2️⃣ Bookings per day and driver (or per package while unassigned)
+    waiting_package = case(
+        (ManualBooking.driver_id.is_(None), ManualBooking.tour_package_id)
+    )
+    rows = (
+        db.query(
+            ManualBooking.travel_date,
+            ManualBooking.driver_id,
+            waiting_package,
+            func.count(ManualBooking.id),
+            func.coalesce(func.sum(ManualBooking.adults + ManualBooking.kids), 0),
+        )
+        .filter(
+            ManualBooking.company_id == company_id,
+            ManualBooking.is_deleted == False,
+            ManualBooking.travel_date >= date_from,
+            ManualBooking.travel_date < date_to,
+        )
+        .group_by(ManualBooking.travel_date, ManualBooking.driver_id, waiting_package)
+        .all()
+    )
+
+    free = np.ones((days, len(seats)), dtype=bool)
+    waiting = np.zeros((len(titles), days), dtype=np.int64)
+    waiting_pax = np.zeros((len(titles), days), dtype=np.int64)
+
+    for travel_date, driver_id, package_id, count, pax in rows:
+        day = (travel_date - date_from).days
+        if driver_id is not None:
+            if driver_id in driver_index:
+                free[day, driver_index[driver_id]] = False
+        elif package_id in package_index:
+            waiting[package_index[package_id], day] += count
+            waiting_pax[package_index[package_id], day] += int(pax)
+
+    remaining_drivers = np.maximum(link @ free.T - waiting, 0)
+    remaining_seats = np.maximum((link * seats) @ free.T - waiting_pax, 0)
+
+    return {
+        "from": date_from.isoformat(),
+        "days": days,
+        "packages": {
+            "id": list(package_index),
+            "title": titles,
+            "drivers": link.sum(axis=1).tolist(),
+            "seats": (link @ seats).tolist(),
+        },
+        "remaining_drivers": remaining_drivers.tolist(),
+        "remaining_seats": remaining_seats.tolist(),
+    }
+
+
+def cached_package_heatmap(
+    db: Session,
+    company_id: int,
+    date_from: date,
+    date_to: date,
+) -> dict:
+    key = (company_id, date_from, date_to)
+    now = time.monotonic()
+
+    with _heatmap_lock:
+        entry = _heatmap_cache.get(key)
+        if entry and entry[0] > now:
+            return entry[1]
+        version = _heatmap_versions.get(company_id, 0)
+
+    heatmap = package_heatmap(db, company_id, date_from, date_to)
+
+    with _heatmap_lock:
+        # bookings changed while computing — don't cache a stale result
+        if _heatmap_versions.get(company_id, 0) != version:
+            return heatmap
+        if len(_heatmap_cache) >= HEATMAP_CACHE_SIZE:
+            for stale in [k for k, v in _heatmap_cache.items() if v[0] <= now] or list(_heatmap_cache)[:1]:
+                del _heatmap_cache[stale]
+        _heatmap_cache[key] = (now + HEATMAP_CACHE_TTL, heatmap)
+
+    return heatmap
+
+
+def invalidate_availability(company_id: int) -> None:
+    """
+    Drop the company's cached heatmaps after its bookings, packages or
+    drivers changed.
+    """
+    with _heatmap_lock:
+        _heatmap_versions[company_id] = _heatmap_versions.get(company_id, 0) + 1
+        for key in [k for k in _heatmap_cache if k[0] == company_id]:
+            del _heatmap_cache[key]
@@ -0,0 +1,94 @@
+import logging
+from datetime import date
+
+from sqlalchemy import Date, cast, func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.booking_daily_stats import BookingDailyStats
+from app.models.manual_booking import ManualBooking
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_COLUMNS = (
+    "booking_count",
+    "pending_count",
+    "pax",
+    "total_amount",
+    "advance_amount",
+    "remaining_amount",
+)
+
+
+def booking_stats_delta(booking, sign: int = 1) -> dict:
+    """
+    Rollup contribution of one booking; sign=-1 removes it again.
+    """
+    created_at = booking.created_at
+    day = created_at.date() if created_at else date.today()
+
+    return {
+        "company_id": int(booking.company_id),
+        "day": day,
+        "tour_package_id": int(booking.tour_package_id),
+        "booking_count": sign,
+        "pending_count": sign if booking.payment_status != "paid" else 0,
+        "pax": sign * (int(booking.adults or 0) + int(booking.kids or 0)),
+        "total_amount": sign * float(booking.total_amount or 0),
+        "advance_amount": sign * float(booking.advance_amount or 0),
+        "remaining_amount": sign * float(booking.remaining_amount or 0),
+    }
+
+
+def apply_booking_stats(db: Session, *deltas: dict) -> None:
+    """
+    Upsert rollup deltas in the caller's transaction; the caller commits
+    them together with the booking change.
+    """
+    for delta in deltas:
+        stmt = insert(BookingDailyStats).values(**delta)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["company_id", "day", "tour_package_id"],
+            set_={
+                column: getattr(BookingDailyStats, column) + getattr(stmt.excluded, column)
+                for column in ROLLUP_COLUMNS
+            },
+        )
+        db.execute(stmt)
+
+
+def rebuild_booking_daily_stats(db: Session) -> int:
+    """
+    Recompute the whole rollup from manual_bookings. Booking writes are
+    blocked (SHARE lock) until the rebuild commits so no delta is lost.
+    """
+    db.execute(text("LOCK TABLE manual_bookings IN SHARE MODE"))
+    db.query(BookingDailyStats).delete(synchronize_session=False)
+
+    day = cast(ManualBooking.created_at, Date)
+    source = (
+        db.query(
+            ManualBooking.company_id,
+            day,
+            ManualBooking.tour_package_id,
+            func.count(ManualBooking.id),
+            func.count(ManualBooking.id).filter(ManualBooking.payment_status != "paid"),
+            func.coalesce(func.sum(ManualBooking.adults + ManualBooking.kids), 0),
+            func.coalesce(func.sum(ManualBooking.total_amount), 0),
+            func.coalesce(func.sum(ManualBooking.advance_amount), 0),
+            func.coalesce(func.sum(ManualBooking.remaining_amount), 0),
+        )
+        .filter(ManualBooking.is_deleted == False)
+        .group_by(ManualBooking.company_id, day, ManualBooking.tour_package_id)
+    )
+
+    result = db.execute(
+        insert(BookingDailyStats).from_select(
+            ["company_id", "day", "tour_package_id", *ROLLUP_COLUMNS],
+            source.statement,
+        )
+    )
+    db.commit()
+
+    logger.info("Rebuilt booking_daily_stats: %s rows", result.rowcount)
+    return result.rowcount
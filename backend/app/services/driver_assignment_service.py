@@ -0,0 +1,171 @@
+import logging
+from collections import deque
+from datetime import date
+
+from sqlalchemy import bindparam, exists, update
+from sqlalchemy.orm import Session
+
+from app.models.driver import Driver
+from app.models.manual_booking import ManualBooking
+from app.models.tour_package import TourPackageDriver
+
+logger = logging.getLogger(__name__)
+
+
+def hopcroft_karp(adjacency: list, right_count: int) -> list:
+    """
+    Maximum bipartite matching. adjacency[u] lists the right-hand vertices
+    left vertex u may take; returns match[u] (right vertex or None).
+    """
+    left_count = len(adjacency)
+    match_left = [None] * left_count
+    match_right = [None] * right_count
+
+    while True:
+        # BFS: layer the free left vertices and their alternating paths
+        layer = [None] * left_count
+        queue = deque()
+        for u in range(left_count):
+            if match_left[u] is None:
+                layer[u] = 0
+                queue.append(u)
+
+        found = False
+        while queue:
+            u = queue.popleft()
+            for v in adjacency[u]:
+                w = match_right[v]
+                if w is None:
+                    found = True
+                elif layer[w] is None:
+                    layer[w] = layer[u] + 1
+                    queue.append(w)
+
+        if not found:
+            return match_left
+
+        # DFS (iterative): vertex-disjoint shortest augmenting paths
+        next_edge = [0] * left_count
+        for root in range(left_count):
+            if match_left[root] is not None:
+                continue
+
+            path = [root]
+            while path:
+                u = path[-1]
+                if next_edge[u] == len(adjacency[u]):
+                    layer[u] = None     # dead end for this phase
+                    path.pop()
+                    continue
+
+                v = adjacency[u][next_edge[u]]
+                next_edge[u] += 1
+                w = match_right[v]
+
+                if w is None:
+                    # augment along the path
+                    for x in reversed(path):
+                        previous = match_left[x]
+                        match_left[x] = v
+                        match_right[v] = x
+                        v = previous
+                    break
+
+                if layer[w] == layer[u] + 1:
+                    path.append(w)
+
+
+def auto_assign_drivers(db: Session, company_id: int, travel_date: date) -> dict:
+    """
+    Give every unassigned booking of the day a free driver of its package
+    with enough seats, assigning as many bookings as possible. Written in
+    one executemany UPDATE; the caller commits.
+    """
+    bookings = (
+        db.query(
+            ManualBooking.id,
+            ManualBooking.tour_package_id,
+            ManualBooking.adults,
+            ManualBooking.kids,
+        )
+        .filter(
+            ManualBooking.company_id == company_id,
+            ManualBooking.travel_date == travel_date,
+            ManualBooking.driver_id.is_(None),
+            ManualBooking.is_deleted == False
+        )
+        .order_by(ManualBooking.id)
+        .all()
+    )
+    if not bookings:
+        return {"assigned": 0, "unassigned": 0}
+
+    # Drivers already holding a booking that day
+    taken = exists().where(
+        ManualBooking.driver_id == Driver.id,
+        ManualBooking.company_id == company_id,
+        ManualBooking.travel_date == travel_date,
+        ManualBooking.is_deleted == False
+    )
+
+    links = (
+        db.query(TourPackageDriver.tour_package_id, Driver.id, Driver.seats)
+        .join(Driver, Driver.id == TourPackageDriver.driver_id)
+        .filter(
+            TourPackageDriver.tour_package_id.in_({b.tour_package_id for b in bookings}),
+            Driver.company_id == company_id,
+            Driver.is_deleted == False,
+            ~taken
+        )
+        # smallest fitting vehicle first, leaving big ones for big parties
+        .order_by(Driver.seats, Driver.id)
+        .all()
+    )
+
+    driver_ids = []
+    driver_index = {}
+    package_drivers = {}
+    for package_id, driver_id, seats in links:
+        if driver_id not in driver_index:
+            driver_index[driver_id] = len(driver_ids)
+            driver_ids.append(driver_id)
+        package_drivers.setdefault(package_id, []).append((driver_index[driver_id], seats))
+
+    adjacency = []
+    for b in bookings:
+        pax = (b.adults or 0) + (b.kids or 0)
+        adjacency.append([
+            index
+            for index, seats in package_drivers.get(b.tour_package_id, [])
+            if seats is None or seats >= pax
+        ])
+
+    match = hopcroft_karp(adjacency, len(driver_ids))
+
+    assignments = [
+        {"booking_id": b.id, "assigned_driver_id": driver_ids[m]}
+        for b, m in zip(bookings, match)
+        if m is not None
+    ]
+
+    if assignments:
+        table = ManualBooking.__table__
+        db.execute(
+            update(table)
+            .where(
+                table.c.id == bindparam("booking_id"),
+                table.c.driver_id.is_(None)
+            )
+            .values(driver_id=bindparam("assigned_driver_id")),
+            assignments,
+        )
+
+    logger.info(
+        "Auto-assigned %s of %s bookings for company %s on %s",
+        len(assignments), len(bookings), company_id, travel_date
+    )
+
+    return {
+        "assigned": len(assignments),
+        "unassigned": len(bookings) - len(assignments),
+    }
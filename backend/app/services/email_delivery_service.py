@@ -0,0 +1,194 @@
+import asyncio
+import logging
+import os
+from email.message import EmailMessage
+from email.utils import formataddr
+
+import aiosmtplib
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from app.core.config import settings
+from app.core.email import conf
+
+logger = logging.getLogger(__name__)
+
+# SMTP connections kept open (one sender task each)
+EMAIL_POOL_SIZE = int(os.getenv("EMAIL_POOL_SIZE", "2"))
+# messages a sender takes off the queue per connection check
+EMAIL_BATCH_SIZE = 20
+# reconnect after this many messages (servers cap messages per session)
+EMAIL_MAX_PER_CONNECTION = 100
+# close a connection nobody used for this long
+EMAIL_IDLE_SECONDS = 30
+
+
+def email_url_for(name: str, path: str) -> str:
+    """
+    url_for('static', path=...) for email templates: absolute, since
+    there is no request to resolve it against.
+    """
+    return f"{settings.BASE_URL.rstrip('/')}/{name}/{path}"
+
+
+# loaded and compiled once, not per message
+email_templates = Environment(
+    loader=FileSystemLoader(conf.TEMPLATE_FOLDER),
+    autoescape=select_autoescape(["html"]),
+)
+email_templates.globals["url_for"] = email_url_for
+EMAIL_TEMPLATES = {
+    name: email_templates.get_template(name)
+    for name in ("company_created.html", "reset_password.html")
+}
+
+
+def render_email(to: str, subject: str, template_name: str, context: dict) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = formataddr((conf.MAIL_FROM_NAME, conf.MAIL_FROM))
+    message["To"] = to
+    message["Subject"] = subject
+    message.set_content(EMAIL_TEMPLATES[template_name].render(**context), subtype="html")
+    return message
+
+
+class SMTPConnection:
+    """
+    One reusable SMTP session: connected on first use, re-opened after
+    EMAIL_MAX_PER_CONNECTION messages or when the server hung up.
+    """
+
+    def __init__(self, hostname: str = conf.MAIL_SERVER, port: int = conf.MAIL_PORT):
+        self.hostname = hostname
+        self.port = port
+        self.client = None
+        self.sent = 0
+
+    def _new_client(self) -> aiosmtplib.SMTP:
+        credentials = {}
+        if conf.USE_CREDENTIALS:
+            credentials = {
+                "username": conf.MAIL_USERNAME,
+                "password": conf.MAIL_PASSWORD.get_secret_value(),
+            }
+        return aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            use_tls=conf.MAIL_SSL_TLS,
+            start_tls=conf.MAIL_STARTTLS,
+            validate_certs=conf.VALIDATE_CERTS,
+            timeout=conf.TIMEOUT,
+            **credentials,
+        )
+
+    async def _connect(self) -> None:
+        await self.close()
+        self.client = self._new_client()
+        await self.client.connect()
+        self.sent = 0
+
+    async def send(self, message: EmailMessage) -> None:
+        if self.client is None or not self.client.is_connected or self.sent >= EMAIL_MAX_PER_CONNECTION:
+            await self._connect()
+
+        try:
+            await self.client.send_message(message)
+        except (aiosmtplib.SMTPServerDisconnected, ConnectionError):
+            # idle connection dropped by the server: one fresh attempt
+            await self._connect()
+            await self.client.send_message(message)
+        self.sent += 1
+
+    async def close(self) -> None:
+        client, self.client = self.client, None
+        if client is not None and client.is_connected:
+            try:
+                await client.quit()
+            except aiosmtplib.SMTPException:
+                client.close()
+
+
+class EmailDelivery:
+    """
+    Queue drained by EMAIL_POOL_SIZE sender tasks, each reusing its own
+    SMTP connection for batches of queued messages, so a burst of emails
+    costs one handshake per connection instead of one per email.
+    """
+
+    def __init__(self, pool_size: int = EMAIL_POOL_SIZE, batch_size: int = EMAIL_BATCH_SIZE, **connection):
+        self.pool_size = pool_size
+        self.batch_size = batch_size
+        self.connection = connection
+        self._loop = None
+        self._queue = None
+        self._senders = []
+
+    def _start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+
+        # first use (or a new event loop, e.g. a script calling asyncio.run twice)
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._senders = [
+            loop.create_task(self._sender(SMTPConnection(**self.connection)))
+            for _ in range(self.pool_size)
+        ]
+
+    async def _next_batch(self) -> list:
+        batch = [await asyncio.wait_for(self._queue.get(), EMAIL_IDLE_SECONDS)]
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _sender(self, connection: SMTPConnection) -> None:
+        try:
+            while True:
+                try:
+                    batch = await self._next_batch()
+                except asyncio.TimeoutError:
+                    await connection.close()
+                    continue
+
+                for message, done in batch:
+                    try:
+                        await connection.send(message)
+                    except Exception as exc:
+                        logger.error("Email to %s failed: %s", message["To"], exc)
+                        await connection.close()
+                        if not done.done():
+                            done.set_exception(exc)
+                    else:
+                        if not done.done():
+                            done.set_result(None)
+                    finally:
+                        self._queue.task_done()
+        finally:
+            await connection.close()
+
+    def enqueue(self, message: EmailMessage) -> asyncio.Future:
+        """
+        Queue `message`; the returned future resolves once it is sent.
+        """
+        self._start()
+        done = self._loop.create_future()
+        self._queue.put_nowait((message, done))
+        return done
+
+    async def send(self, message: EmailMessage) -> None:
+        await self.enqueue(message)
+
+    async def close(self) -> None:
+        """
+        Send what is queued, then close every connection.
+        """
+        if self._queue is None or self._loop is not asyncio.get_running_loop():
+            return
+        await self._queue.join()
+        for sender in self._senders:
+            sender.cancel()
+        await asyncio.gather(*self._senders, return_exceptions=True)
+        self._loop, self._queue, self._senders = None, None, []
+
+
+email_delivery = EmailDelivery()
@@ -1,6 +1,5 @@
-from fastapi_mail import MessageSchema
 from pydantic import EmailStr
-from app.core.email import fast_mail
+from app.services.email_delivery_service import email_delivery, render_email
 
 
 async def send_company_created_email(
@@ -9,39 +8,34 @@ async def send_company_created_email(
     password: str,
     login_url: str,
 ):
-    message = MessageSchema(
+    message = render_email(
+        to=email,
         subject="Your Company Account Has Been Created",
-        recipients=[email],
-        template_body={
+        template_name="company_created.html",
+        context={
             "email": email,
             "company_name": company_name,
             "password": password,
             "login_url": login_url,
         },
-        subtype="html",
     )
 
-    await fast_mail.send_message(
-        message,
-        template_name="company_created.html",
-    )
+    # pooled SMTP connection, see app.services.email_delivery_service
+    await email_delivery.send(message)
 
 
 async def send_reset_password_email(
     email: EmailStr,
     reset_url: str,
 ):
-    message = MessageSchema(
+    message = render_email(
+        to=email,
         subject="Reset Your Password",
-        recipients=[email],
-        template_body={
+        template_name="reset_password.html",
+        context={
             "email": email,
             "reset_url": reset_url,
         },
-        subtype="html",
     )
 
-    await fast_mail.send_message(
-        message,
-        template_name="reset_password.html",
-    )
\ No newline at end of file
+    await email_delivery.send(message)
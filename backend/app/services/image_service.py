@@ -0,0 +1,75 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import func
+
+from app.database.session import SessionLocal
+from app.models.tour_package import TourPackage, TourPackageGalleryImage
+from app.utils.image_variants import render_image_variants
+from app.utils.page_cache import bump_page_versions
+
+logger = logging.getLogger(__name__)
+
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_image_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: never fork the server's threads / open DB connections
+            _pool = ProcessPoolExecutor(
+                max_workers=IMAGE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def store_image_variants(image_id: int, image_path: str, variants: dict) -> None:
+    """
+    Save the rendered variants on the gallery row (and the package when
+    it is the cover), unless the image was replaced meanwhile.
+    """
+    db = SessionLocal()
+    try:
+        image = db.get(TourPackageGalleryImage, image_id)
+        if not image or image.image_path != image_path:
+            return
+
+        image.variants = variants
+        package = image.tour_package
+        if package.cover_image_path == image_path:
+            package.cover_image_variants = variants
+        # rendered pages / ETags of the package change with the srcset
+        package.updated_at = func.now()
+        db.commit()
+
+        bump_page_versions("catalog", f"package:{package.id}")
+    finally:
+        db.close()
+
+
+def _on_variants_done(image_id: int, image_path: str):
+    def done(future):
+        try:
+            store_image_variants(image_id, image_path, future.result())
+        except Exception:
+            logger.exception("Image variants failed for gallery image %s (%s)", image_id, image_path)
+
+    return done
+
+
+def process_gallery_images(images) -> None:
+    """
+    Queue variant rendering for committed gallery images; returns at once.
+    """
+    pool = get_image_pool()
+    for image in images:
+        future = pool.submit(render_image_variants, image.image_path)
+        future.add_done_callback(_on_variants_done(image.id, image.image_path))
@@ -0,0 +1,171 @@
+import logging
+import os
+import time
+from collections import Counter
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.models.company import Company
+from app.models.driver import Driver
+from app.models.tour_package import TourPackage, TourPackageGalleryImage
+from app.utils.file_upload import STATIC_ROOT, UPLOAD_STORE
+from app.utils.image_variants import IMAGE_VARIANTS
+
+logger = logging.getLogger(__name__)
+
+# every column holding a static-relative upload path
+UPLOAD_REFERENCES = (
+    TourPackageGalleryImage.image_path,
+    TourPackage.cover_image_path,
+    Company.logo,
+    Driver.image,
+)
+
+# the blob store plus the per-type directories of older uploads
+GC_ROOTS = (UPLOAD_STORE, "uploads/tours", "uploads/drivers", "uploads/companies")
+
+# never touch files younger than this: an upload is written (or its blob
+# touched) shortly before the row referencing it commits
+GC_GRACE_SECONDS = 3600
+GC_BATCH_SIZE = 500
+
+
+def upload_stem(path: str) -> str:
+    """
+    Path without extension and variant suffix, so a blob and its resized
+    copies (x.png, x.card.webp, x.thumb.jpg) share one key.
+    """
+    stem, _ = os.path.splitext(path)
+    base, dot, suffix = stem.rpartition(".")
+    if dot and suffix in IMAGE_VARIANTS:
+        return base
+    return stem
+
+
+def upload_reference_counts(db: Session) -> Counter:
+    """
+    Reference count per upload stem over all UPLOAD_REFERENCES, read in
+    batches. Soft-deleted rows still count (they can be restored).
+    """
+    counts = Counter()
+    for column in UPLOAD_REFERENCES:
+        rows = (
+            db.query(column)
+            .filter(column.isnot(None), column != "")
+            .yield_per(GC_BATCH_SIZE)
+        )
+        for (path,) in rows:
+            counts[upload_stem(path)] += 1
+    return counts
+
+
+def _static_path(full_path: str) -> str:
+    return os.path.relpath(full_path, STATIC_ROOT).replace(os.sep, "/")
+
+
+def _is_temp_file(name: str) -> bool:
+    # leftovers of interrupted uploads / variant renders
+    return name.startswith(".upload-") or name.endswith(".tmp")
+
+
+def referenced_stems(db: Session, stems: set) -> set:
+    """
+    The `stems` some row references right now (a fresh read, for rows
+    committed after upload_reference_counts ran).
+    """
+    found = set()
+    for column in UPLOAD_REFERENCES:
+        rows = db.query(column).filter(
+            or_(*(column.startswith(f"{stem}.", autoescape=True) for stem in stems))
+        )
+        found.update(upload_stem(path) for (path,) in rows)
+    return found
+
+
+def _delete_batch(db: Session, paths: list, cutoff: float, dry_run: bool) -> tuple:
+    """
+    Delete the queued `paths`, re-checking each one first: a new upload
+    can reuse a blob between the scan and now (save_upload refreshes its
+    mtime, then commits the row). Returns (deleted, bytes, referenced).
+    """
+    stems = {
+        upload_stem(_static_path(path))
+        for path in paths
+        if not _is_temp_file(os.path.basename(path))
+    }
+    referenced = referenced_stems(db, stems) if stems else set()
+    db.rollback()  # don't hold the snapshot open while deleting
+
+    deleted = freed = still_referenced = 0
+    for path in paths:
+        if not _is_temp_file(os.path.basename(path)) and upload_stem(_static_path(path)) in referenced:
+            still_referenced += 1
+            continue
+        try:
+            # re-stat right before removing: touched since the scan means reused
+            info = os.stat(path)
+            if info.st_mtime > cutoff:
+                continue
+            if not dry_run:
+                os.remove(path)
+        except FileNotFoundError:
+            continue
+        deleted += 1
+        freed += info.st_size
+
+    logger.info("Upload GC %s %s files (%s bytes)", "would delete" if dry_run else "deleted", deleted, freed)
+    return deleted, freed, still_referenced
+
+
+def collect_orphan_uploads(
+    db: Session,
+    grace_seconds: int = GC_GRACE_SECONDS,
+    batch_size: int = GC_BATCH_SIZE,
+    dry_run: bool = False,
+) -> dict:
+    """
+    Delete upload files (blobs and their variants) no row references,
+    in batches of `batch_size`. References are loaded first, so a file
+    referenced by a row committed during the scan is protected by the
+    grace period instead; each batch re-checks references and mtimes
+    right before deleting.
+    """
+    references = upload_reference_counts(db)
+    cutoff = time.time() - grace_seconds
+    stats = {"scanned": 0, "referenced": 0, "deleted": 0, "bytes": 0}
+    batch = []
+
+    for root in GC_ROOTS:
+        for directory, _, files in os.walk(os.path.join(STATIC_ROOT, root)):
+            for name in files:
+                full_path = os.path.join(directory, name)
+                stats["scanned"] += 1
+
+                if not _is_temp_file(name):
+                    if references[upload_stem(_static_path(full_path))]:
+                        stats["referenced"] += 1
+                        continue
+
+                try:
+                    if os.path.getmtime(full_path) > cutoff:
+                        continue
+                except FileNotFoundError:
+                    continue
+
+                batch.append(full_path)
+                if len(batch) >= batch_size:
+                    _count_batch(stats, _delete_batch(db, batch, cutoff, dry_run))
+                    batch = []
+
+    if batch:
+        _count_batch(stats, _delete_batch(db, batch, cutoff, dry_run))
+
+    return stats
+
+
+def _count_batch(stats: dict, result: tuple) -> None:
+    deleted, freed, referenced = result
+    stats["deleted"] += deleted
+    stats["bytes"] += freed
+    stats["referenced"] += referenced
@@ -0,0 +1,226 @@
+import asyncio
+import logging
+import os
+import random
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from sqlalchemy import func
+
+from app.database.session import SessionLocal
+from app.models.whatsapp_outbox import (
+    WhatsAppOutbox,
+    OUTBOX_PENDING,
+    OUTBOX_SENDING,
+    OUTBOX_SENT,
+    OUTBOX_FAILED,
+)
+from app.services.whatsapp_service import WHATSAPP_API_URL
+
+logger = logging.getLogger(__name__)
+
+# parallel requests to the Graph API, also the keep-alive pool size
+WHATSAPP_CONCURRENCY = int(os.getenv("WHATSAPP_CONCURRENCY", "10"))
+WHATSAPP_TIMEOUT = httpx.Timeout(10, connect=5)
+
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_POLL_SECONDS = 2
+OUTBOX_MAX_ATTEMPTS = 8
+# retry after 5 s, 10 s, 20 s ... at most 30 min apart, plus up to 20 % jitter
+OUTBOX_BACKOFF_BASE = 5
+OUTBOX_BACKOFF_MAX = 1800
+# a claimed row goes back to the queue if its worker never reports back
+OUTBOX_CLAIM_SECONDS = 120
+
+
+def backoff_seconds(attempts: int) -> float:
+    delay = min(OUTBOX_BACKOFF_MAX, OUTBOX_BACKOFF_BASE * 2 ** (attempts - 1))
+    return delay * (1 + random.random() * 0.2)
+
+
+def whatsapp_client(
+    api_url: str = WHATSAPP_API_URL,
+    concurrency: int = WHATSAPP_CONCURRENCY,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> httpx.AsyncClient:
+    """
+    Pooled client for the messages endpoint of the configured sender.
+    """
+    access_token = os.getenv("WHATSAPP_ACCESS_TOKEN")
+    phone_number_id = os.getenv("WHATSAPP_PHONE_NUMBER_ID")
+
+    if not access_token or not phone_number_id:
+        raise ValueError("WhatsApp credentials missing")
+
+    return httpx.AsyncClient(
+        base_url=f"{api_url}/{phone_number_id}",
+        headers={"Authorization": f"Bearer {access_token}"},
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        timeout=WHATSAPP_TIMEOUT,
+        transport=transport,
+    )
+
+
+def claim_due_messages(limit: int = OUTBOX_BATCH_SIZE) -> list:
+    """
+    Mark up to `limit` due rows as sending and return (id, payload) pairs.
+    SKIP LOCKED lets several workers drain the outbox side by side.
+
+    A claim that expired on its last attempt (the worker died before
+    reporting back) fails the row instead of retrying it again.
+    """
+    db = SessionLocal()
+    try:
+        now = datetime.now(timezone.utc)
+        due = (
+            WhatsAppOutbox.status.in_((OUTBOX_PENDING, OUTBOX_SENDING)),
+            WhatsAppOutbox.next_attempt_at <= now,
+        )
+
+        exhausted = (
+            db.query(WhatsAppOutbox)
+            .filter(*due, WhatsAppOutbox.attempts >= OUTBOX_MAX_ATTEMPTS)
+            .update(
+                {
+                    WhatsAppOutbox.status: OUTBOX_FAILED,
+                    WhatsAppOutbox.last_error: func.coalesce(
+                        WhatsAppOutbox.last_error, "no result reported for the last attempt"
+                    ),
+                },
+                synchronize_session=False,
+            )
+        )
+        if exhausted:
+            logger.error("WhatsApp outbox: %s messages failed after %s attempts", exhausted, OUTBOX_MAX_ATTEMPTS)
+
+        rows = (
+            db.query(WhatsAppOutbox)
+            .filter(*due, WhatsAppOutbox.attempts < OUTBOX_MAX_ATTEMPTS)
+            .order_by(WhatsAppOutbox.next_attempt_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+
+        for row in rows:
+            row.status = OUTBOX_SENDING
+            row.attempts += 1
+            row.next_attempt_at = now + timedelta(seconds=OUTBOX_CLAIM_SECONDS)
+
+        claimed = [(row.id, row.payload) for row in rows]
+        db.commit()
+        return claimed
+    finally:
+        db.close()
+
+
+def record_results(results: dict) -> None:
+    """
+    results: {outbox id: (status, message id or error)}, status being
+    OUTBOX_SENT, OUTBOX_PENDING (retry) or OUTBOX_FAILED.
+    """
+    db = SessionLocal()
+    try:
+        now = datetime.now(timezone.utc)
+        rows = db.query(WhatsAppOutbox).filter(WhatsAppOutbox.id.in_(list(results))).all()
+
+        for row in rows:
+            status, detail = results[row.id]
+
+            if status == OUTBOX_SENT:
+                row.status = OUTBOX_SENT
+                row.provider_message_id = detail
+                row.sent_at = now
+                row.last_error = None
+            elif status == OUTBOX_PENDING and row.attempts < OUTBOX_MAX_ATTEMPTS:
+                row.status = OUTBOX_PENDING
+                row.next_attempt_at = now + timedelta(seconds=backoff_seconds(row.attempts))
+                row.last_error = detail
+            else:
+                row.status = OUTBOX_FAILED
+                row.last_error = detail
+                logger.error("WhatsApp message %s failed after %s attempts: %s", row.id, row.attempts, detail)
+
+        db.commit()
+    finally:
+        db.close()
+
+
+async def deliver(client: httpx.AsyncClient, payload: dict) -> tuple:
+    """
+    POST one message; (OUTBOX_SENT, message id), (OUTBOX_PENDING, error)
+    for errors worth retrying or (OUTBOX_FAILED, error).
+    """
+    try:
+        response = await client.post("/messages", json=payload)
+    except httpx.TransportError as exc:
+        return OUTBOX_PENDING, f"{type(exc).__name__}: {exc}"
+
+    if response.is_success:
+        try:
+            message_id = response.json()["messages"][0]["id"]
+        except (ValueError, KeyError, IndexError, TypeError):
+            message_id = None
+        return OUTBOX_SENT, message_id
+
+    error = f"HTTP {response.status_code}: {response.text[:500]}"
+    # throttled / Meta-side trouble: try again later; anything else
+    # (bad number, unknown template, auth) will not fix itself
+    if response.status_code in (408, 429) or response.status_code >= 500:
+        return OUTBOX_PENDING, error
+    return OUTBOX_FAILED, error
+
+
+async def drain_outbox(
+    client: httpx.AsyncClient,
+    batch_size: int = OUTBOX_BATCH_SIZE,
+    concurrency: int = WHATSAPP_CONCURRENCY,
+) -> int:
+    """
+    Send one batch of due messages; returns how many were attempted.
+    """
+    claimed = await asyncio.to_thread(claim_due_messages, batch_size)
+    if not claimed:
+        return 0
+
+    limit = asyncio.Semaphore(concurrency)
+
+    async def send(outbox_id: int, payload: dict):
+        async with limit:
+            return outbox_id, await deliver(client, payload)
+
+    results = dict(await asyncio.gather(*(send(outbox_id, payload) for outbox_id, payload in claimed)))
+    await asyncio.to_thread(record_results, results)
+
+    sent = sum(1 for status, _ in results.values() if status == OUTBOX_SENT)
+    logger.info("WhatsApp outbox: %s of %s messages sent", sent, len(results))
+    return len(results)
+
+
+async def run_outbox_worker(
+    once: bool = False,
+    api_url: str = WHATSAPP_API_URL,
+    poll_seconds: float = OUTBOX_POLL_SECONDS,
+    batch_size: int = OUTBOX_BATCH_SIZE,
+    concurrency: int = WHATSAPP_CONCURRENCY,
+) -> int:
+    """
+    Drain the outbox until it is empty (`once`) or forever, polling every
+    `poll_seconds` while idle. Returns the number of messages attempted.
+    """
+    total = 0
+    async with whatsapp_client(api_url, concurrency) as client:
+        while True:
+            try:
+                attempted = await drain_outbox(client, batch_size, concurrency)
+            except Exception:
+                if once:
+                    raise
+                logger.exception("WhatsApp outbox batch failed")
+                attempted = 0
+
+            total += attempted
+            if not attempted:
+                if once:
+                    return total
+                await asyncio.sleep(poll_seconds)
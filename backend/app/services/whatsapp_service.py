@@ -1,109 +1,74 @@
-import requests
 import os
-import logging
 
-logger = logging.getLogger(__name__)
+from app.models.whatsapp_outbox import WhatsAppOutbox
 
-WHATSAPP_API_URL = "https://graph.facebook.com/v17.0"
+# overridable so the outbox worker can be pointed at a local fake server
+WHATSAPP_API_URL = os.getenv("WHATSAPP_API_URL", "https://graph.facebook.com/v17.0")
 
 
-def send_whatsapp_booking_confirmation(phone_number: str, booking):
-    access_token = os.getenv("WHATSAPP_ACCESS_TOKEN")
-    phone_number_id = os.getenv("WHATSAPP_PHONE_NUMBER_ID")
-
-    if not access_token or not phone_number_id:
-        raise ValueError("WhatsApp credentials missing")
-
-    url = f"{WHATSAPP_API_URL}/{phone_number_id}/messages"
-
-    payload = {
+def template_message(phone_number: str, template: str, parameters: list) -> dict:
+    """
+    Graph API body of a template message with text body parameters.
+    """
+    return {
         "messaging_product": "whatsapp",
         "to": phone_number,
         "type": "template",
         "template": {
-            "name": "booking_confirmed",  # Your WhatsApp template name
+            "name": template,
             "language": {"code": "en_US"},
             "components": [
                 {
                     "type": "body",
-                    "parameters": [
-                        {"type": "text", "text": booking.customer.guest_name},                        # {{1}}
-                        {"type": "text", "text": booking.tour_package.title},                 # {{2}}
-                        {"type": "text", "text": str(booking.travel_date)},                   # {{3}}
-                        {"type": "text", "text": str(booking.travel_time or "-")},           # {{4}}
-                        {"type": "text", "text": booking.pickup_location or "-"},            # {{5}}
-                        {"type": "text", "text": str(booking.adults)},                        # {{6}}
-                        {"type": "text", "text": str(booking.kids)},                          # {{7}}
-                        {"type": "text", "text": str(booking.total_amount)},                  # {{8}}
-                        # {"type": "text", "text": booking.tour_package.currency or ""},       # {{9}}
-                        # {"type": "text", "text": str(booking.advance_amount)},                # {{10}}
-                        # {"type": "text", "text": booking.tour_package.currency or ""},       # {{11}}
-                        # {"type": "text", "text": str(booking.remaining_amount)},              # {{12}}
-                        # {"type": "text", "text": booking.tour_package.currency or ""},       # {{13}}
-                    ],
+                    "parameters": [{"type": "text", "text": text} for text in parameters],
                 }
             ],
         },
     }
 
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json",
-    }
-
-    response = requests.post(url, json=payload, headers=headers, timeout=10)
-
-    if response.status_code != 200:
-        logger.error("WhatsApp error: %s", response.text)
-        response.raise_for_status()
 
-    logger.info("WhatsApp booking confirmation sent to %s", phone_number)
-    return response.json()
+def booking_confirmation_message(phone_number: str, booking) -> dict:
+    return template_message(phone_number, "booking_confirmed", [
+        booking.customer.guest_name,            # {{1}}
+        booking.tour_package.title,             # {{2}}
+        str(booking.travel_date),               # {{3}}
+        str(booking.travel_time or "-"),        # {{4}}
+        booking.pickup_location or "-",         # {{5}}
+        str(booking.adults),                    # {{6}}
+        str(booking.kids),                      # {{7}}
+        str(booking.total_amount),              # {{8}}
+    ])
 
 
-def send_whatsapp_driver_details(phone_number: str, booking):
-    access_token = os.getenv("WHATSAPP_ACCESS_TOKEN")
-    phone_number_id = os.getenv("WHATSAPP_PHONE_NUMBER_ID")
-
-    url = f"{WHATSAPP_API_URL}/{phone_number_id}/messages"
-
+def driver_details_message(phone_number: str, booking) -> dict:
     driver = booking.driver
 
-    payload = {
-        "messaging_product": "whatsapp",
-        "to": phone_number,
-        "type": "template",
-        "template": {
-            "name": "driver_and_itinerary",
-            "language": {"code": "en_US"},
-            "components": [
-                {
-                    "type": "body",
-                    "parameters": [
-                        {"type": "text", "text": driver.name if driver else "-"},  # {{1}}
-                        {"type": "text", "text": format_phone(driver.country_code, driver.phone_number) if driver else "-"}, # {{2}}
-                        {
-                            "type": "text",
-                            "text": f"{driver.vehicle_type} ({driver.vehicle_number})"
-                            if driver else "-"
-                        }, # {{3}}
-                        {
-                            "type": "text",
-                            "text": booking.tour_package.itinerary or "-"
-                        }, # {{4}}
-                    ],
-                }
-            ],
-        },
-    }
-
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json",
-    }
-
-    response = requests.post(url, json=payload, headers=headers, timeout=10)
-    response.raise_for_status()
+    return template_message(phone_number, "driver_and_itinerary", [
+        driver.name if driver else "-",                                                       # {{1}}
+        format_phone(driver.country_code, driver.phone_number) if driver else "-",            # {{2}}
+        f"{driver.vehicle_type} ({driver.vehicle_number})" if driver else "-",                # {{3}}
+        booking.tour_package.itinerary or "-",                                                # {{4}}
+    ])
+
+
+def enqueue_booking_notifications(db, booking, phone_number: str) -> None:
+    """
+    Add the booking's WhatsApp messages to the outbox, in the caller's
+    transaction: they are sent if and only if the booking commits. The
+    driver message is only queued when the booking has a driver.
+    """
+    messages = [booking_confirmation_message(phone_number, booking)]
+    if booking.driver:
+        messages.append(driver_details_message(phone_number, booking))
+
+    for payload in messages:
+        db.add(WhatsAppOutbox(
+            company_id=booking.company_id,
+            booking_id=booking.id,
+            template=payload["template"]["name"],
+            to_phone=phone_number,
+            payload=payload,
+        ))
 
 
 def format_phone(country_code: str, phone: str) -> str:
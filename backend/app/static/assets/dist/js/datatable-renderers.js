@@ -0,0 +1,86 @@
+/*
+ * Shared DataTables column renderers for the compact ("format=columns")
+ * datatable payload. The server sends typed column arrays plus URL
+ * templates once per response; the markup is built here in the browser.
+ */
+var DTRender = (function () {
+    function escape(value) {
+        if (value === null || value === undefined || value === "") {
+            return "-";
+        }
+        return String(value)
+            .replace(/&/g, "&amp;")
+            .replace(/</g, "&lt;")
+            .replace(/>/g, "&gt;")
+            .replace(/"/g, "&quot;")
+            .replace(/'/g, "&#39;");
+    }
+
+    // {id: [..], name: [..]} -> [{id, name}, ...]
+    function rows(json) {
+        var columns = json.columns || {};
+        var names = Object.keys(columns);
+        var count = names.length ? columns[names[0]].length : 0;
+        var urls = json.urls || {};
+        var result = new Array(count);
+
+        for (var i = 0; i < count; i++) {
+            var row = { _urls: urls };
+            for (var j = 0; j < names.length; j++) {
+                row[names[j]] = columns[names[j]][i];
+            }
+            result[i] = row;
+        }
+        return result;
+    }
+
+    function url(template, id) {
+        return template.replace(/\{[^}]+\}/, encodeURIComponent(id));
+    }
+
+    // ISO yyyy-mm-dd -> dd-mm-yyyy
+    function date(value) {
+        if (!value) return "-";
+        var parts = String(value).split("-");
+        return parts.length === 3 ? parts[2] + "-" + parts[1] + "-" + parts[0] : escape(value);
+    }
+
+    function phone(codeField, phoneField, separator) {
+        return function (data, type, row) {
+            return escape((row[codeField] || "") + (separator || "") + (row[phoneField] || ""));
+        };
+    }
+
+    function text(data) {
+        return escape(data);
+    }
+
+    function money(currency, amount) {
+        return escape(currency) + " " + escape(amount);
+    }
+
+    function actions(options) {
+        return function (data, type, row) {
+            if (type !== "display") return "";
+
+            return (
+                '<a href="' + url(row._urls.edit, row.id) + '" class="btn btn-sm btn-edit" title="' + (options.editTitle || "Edit") + '">' +
+                '<img src="' + options.editIcon + '" alt="Edit" class="table-icon"></a> ' +
+                '<a href="javascript:void(0)" class="' + options.deleteClass + ' btn btn-sm btn-delete"' +
+                ' data-route="' + url(row._urls.delete, row.id) + '" title="' + (options.deleteTitle || "Delete") + '">' +
+                '<img src="' + options.trashIcon + '" alt="Delete" class="table-icon"></a>'
+            );
+        };
+    }
+
+    return {
+        escape: escape,
+        rows: rows,
+        url: url,
+        date: date,
+        phone: phone,
+        text: text,
+        money: money,
+        actions: actions,
+    };
+})();
@@ -0,0 +1,85 @@
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from starlette.routing import NoMatchFound
+
+MAX_PAGE_LENGTH = 100
+
+
+def _int_param(value, default: int) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def datatable_params(request: Request, max_length: int = MAX_PAGE_LENGTH) -> dict:
+    """
+    Parse the DataTables serverSide request (draw, start, length,
+    search[value], order[0][column|dir], columns[i][data]).
+    """
+    params = request.query_params
+
+    length = _int_param(params.get("length"), 10)
+    # DataTables sends -1 for "All" — never hand out an unbounded page
+    if length <= 0 or length > max_length:
+        length = max_length
+
+    order_column = None
+    order_index = params.get("order[0][column]")
+    if order_index is not None:
+        # columnar tables render from several fields, so they order by name
+        order_column = (
+            params.get(f"columns[{order_index}][name]")
+            or params.get(f"columns[{order_index}][data]")
+        )
+
+    return {
+        "draw": _int_param(params.get("draw"), 0),
+        "start": max(_int_param(params.get("start"), 0), 0),
+        "length": length,
+        "search": (params.get("search[value]") or "").strip(),
+        "order_column": order_column,
+        "order_dir": "asc" if params.get("order[0][dir]") == "asc" else "desc",
+    }
+
+
+def datatable_response(
+    draw: int,
+    records_total: int,
+    records_filtered: int,
+    **payload
+):
+    return JSONResponse({
+        "draw": draw,
+        "recordsTotal": records_total,
+        "recordsFiltered": records_filtered,
+        **payload
+    })
+
+
+def columnar(rows, names) -> dict:
+    """
+    Transpose result tuples into {column: [values, ...]} for the compact
+    datatable payload (dates / decimals made JSON-safe).
+    """
+    columns = {name: [] for name in names}
+    appenders = [columns[name].append for name in names]
+
+    for row in rows:
+        for append, value in zip(appenders, row):
+            append(value)
+
+    return jsonable_encoder(columns)
+
+
+def url_template(request: Request, name: str) -> str:
+    """
+    URL of a named route with its path params left as `{param}`
+    placeholders; the column renderers fill in the row id.
+    """
+    for route in request.app.router.routes:
+        if getattr(route, "name", None) == name:
+            return str(request.base_url).rstrip("/") + route.path
+
+    raise NoMatchFound(name, {})
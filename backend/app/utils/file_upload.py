@@ -1,18 +1,140 @@
+import hashlib
 import os
-import uuid
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
 from fastapi import UploadFile
 
-UPLOAD_DIR = "static/uploads/tours"
+STATIC_ROOT = "app/static"
+# content-addressed uploads: uploads/blobs/ab/cd/<sha256>.<ext>
+UPLOAD_STORE = "uploads/blobs"
+
+# copy uploads in 1 MiB chunks, never the whole file in memory
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# MIME type -> (extension, leading magic bytes)
+IMAGE_TYPES = {
+    "image/jpeg": ("jpg", (b"\xff\xd8\xff",)),
+    "image/png": ("png", (b"\x89PNG\r\n\x1a\n",)),
+    "image/gif": ("gif", (b"GIF87a", b"GIF89a")),
+    "image/webp": ("webp", (b"RIFF",)),
+}
+
+# upload kind -> limits
+UPLOAD_LIMITS = {
+    "tour_image": {"max_bytes": 10 * 1024 * 1024, "types": IMAGE_TYPES},
+    "driver_image": {"max_bytes": 5 * 1024 * 1024, "types": IMAGE_TYPES},
+    "company_logo": {"max_bytes": 2 * 1024 * 1024, "types": IMAGE_TYPES},
+}
+
+# concurrent writes of one multi-file form
+UPLOAD_WORKERS = 4
+_upload_pool = ThreadPoolExecutor(max_workers=UPLOAD_WORKERS, thread_name_prefix="upload")
+
+
+class UploadRejected(ValueError):
+    """Upload refused (type or size); the message is shown to the user."""
+
+
+def blob_path(digest: str, extension: str) -> str:
+    """
+    Static-relative path of a blob; two levels of 256 shards keep every
+    directory small.
+    """
+    return f"{UPLOAD_STORE}/{digest[:2]}/{digest[2:4]}/{digest}.{extension}"
+
+
+def _matches_signature(mime_type: str, head: bytes) -> bool:
+    _, signatures = IMAGE_TYPES[mime_type]
+    if not head.startswith(signatures):
+        return False
+    return mime_type != "image/webp" or head[8:12] == b"WEBP"
+
+
+def save_upload(file: UploadFile, kind: str) -> str:
+    """
+    Stream `file` into the content-addressed store in UPLOAD_CHUNK_SIZE
+    chunks, checking the declared MIME type, the file signature and the
+    size limit of `kind` as it goes, and hashing it on the way. Written to
+    a temp file and renamed into place, so a rejected or interrupted
+    upload leaves nothing behind; identical content is stored once.
+
+    Returns the path relative to app/static (what templates pass to
+    url_for('static', ...)). Blobs are never deleted here, see
+    app.services.upload_gc_service.
+    """
+    limits = UPLOAD_LIMITS[kind]
+    label = file.filename or "upload"
+
+    mime_type = (file.content_type or "").split(";")[0].strip().lower()
+    if mime_type not in limits["types"]:
+        raise UploadRejected(f"{label}: unsupported file type")
+
+    extension, _ = limits["types"][mime_type]
+    max_bytes = limits["max_bytes"]
+
+    store_root = os.path.join(STATIC_ROOT, UPLOAD_STORE)
+    os.makedirs(store_root, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=store_root, prefix=".upload-")
+    try:
+        digest = hashlib.sha256()
+        with os.fdopen(fd, "wb") as out:
+            file.file.seek(0)
+            size = 0
+            first = True
+            while chunk := file.file.read(UPLOAD_CHUNK_SIZE):
+                if first and not _matches_signature(mime_type, chunk[:16]):
+                    raise UploadRejected(f"{label}: file content is not a valid {extension.upper()} image")
+                first = False
+
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadRejected(f"{label}: larger than {max_bytes / (1024 * 1024):g} MB")
+                digest.update(chunk)
+                out.write(chunk)
+
+            if first:
+                raise UploadRejected(f"{label}: file is empty")
+
+            out.flush()
+            os.fsync(out.fileno())
+
+        path = blob_path(digest.hexdigest(), extension)
+        target = os.path.join(STATIC_ROOT, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+
+        if os.path.exists(target):
+            # already stored: refresh mtime so the GC grace period covers
+            # the row about to reference it
+            os.utime(target)
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return path
 
 
-def save_file(file: UploadFile) -> str:
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
+def save_uploads(files, kind: str) -> list:
+    """
+    save_upload() for several files at once, written concurrently. If one
+    is rejected the first error is raised; blobs already written stay for
+    the GC (another row may share them).
+    """
+    futures = [_upload_pool.submit(save_upload, file, kind) for file in files]
 
-    ext = file.filename.split(".")[-1]
-    filename = f"{uuid.uuid4()}.{ext}"
-    file_path = os.path.join(UPLOAD_DIR, filename)
+    paths, error = [], None
+    for future in futures:
+        try:
+            paths.append(future.result())
+        except Exception as exc:
+            error = error or exc
 
-    with open(file_path, "wb") as f:
-        f.write(file.file.read())
+    if error:
+        raise error
 
-    return file_path
+    return paths
@@ -0,0 +1,68 @@
+import os
+
+from PIL import Image, ImageOps
+
+STATIC_ROOT = "app/static"
+
+# name -> max width in px; sources narrower than a variant are not upscaled
+IMAGE_VARIANTS = {
+    "thumb": 320,
+    "card": 640,
+    "full": 1600,
+}
+
+# format -> (file extension, Pillow save options)
+VARIANT_FORMATS = {
+    "webp": ("webp", {"quality": 80, "method": 4}),
+    "jpeg": ("jpg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+def variant_path(image_path: str, name: str, extension: str) -> str:
+    """
+    uploads/blobs/ab/cd/<sha256>.png -> uploads/blobs/ab/cd/<sha256>.card.webp
+    """
+    stem, _ = os.path.splitext(image_path)
+    return f"{stem}.{name}.{extension}"
+
+
+def render_image_variants(image_path: str) -> dict:
+    """
+    Write every size / format variant of a static-relative upload next to
+    it. Runs in a worker process (CPU bound), so it only touches files.
+
+    Returns {"thumb": {"width": 320, "webp": path, "jpeg": path}, ...}.
+    """
+    source = os.path.join(STATIC_ROOT, image_path)
+
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        # JPEG has no alpha; flatten transparent PNGs on white
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+
+        variants = {}
+        for name, max_width in IMAGE_VARIANTS.items():
+            resized = image
+            if image.width > max_width:
+                height = round(image.height * max_width / image.width)
+                resized = image.resize((max_width, height), Image.LANCZOS)
+
+            variant = {"width": resized.width}
+            for fmt, (extension, options) in VARIANT_FORMATS.items():
+                path = variant_path(image_path, name, extension)
+                target = os.path.join(STATIC_ROOT, path)
+                # identical uploads share one blob, and so its variants
+                if not os.path.exists(target):
+                    tmp = f"{target}.{os.getpid()}.tmp"
+                    resized.save(tmp, fmt.upper(), **options)
+                    os.replace(tmp, target)
+                variant[fmt] = path
+            variants[name] = variant
+
+    return variants
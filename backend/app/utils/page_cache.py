@@ -0,0 +1,153 @@
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import Request
+from fastapi.responses import HTMLResponse
+
+from app.core.config import settings
+from app.utils.http_cache import not_modified, validator_headers
+
+PAGE_CACHE_SIZE = 512
+# bounds staleness when workers use the in-process backend
+PAGE_CACHE_TTL = 300
+
+
+class LRUPageCacheBackend:
+    """
+    In-process LRU of rendered pages. Version counters live outside the
+    LRU so evicting a page never resets a version.
+    """
+
+    def __init__(self, max_entries: int = PAGE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._pages = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._pages.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._pages[key]
+                return None
+            self._pages.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, body: bytes, ttl: int) -> None:
+        with self._lock:
+            self._pages[key] = (time.monotonic() + ttl, body)
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_entries:
+                self._pages.popitem(last=False)
+
+    def versions(self, names) -> list:
+        with self._lock:
+            return [self._versions.get(name, 0) for name in names]
+
+    def bump(self, names) -> None:
+        with self._lock:
+            for name in names:
+                self._versions[name] = self._versions.get(name, 0) + 1
+
+
+class RedisPageCacheBackend:
+    """
+    Shared backend for multi-worker deployments (PAGE_CACHE_URL=redis://...).
+    Needs the `redis` package.
+    """
+
+    def __init__(self, url: str):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key: str):
+        return self.client.get(f"page:{key}")
+
+    def set(self, key: str, body: bytes, ttl: int) -> None:
+        self.client.set(f"page:{key}", body, ex=ttl)
+
+    def versions(self, names) -> list:
+        values = self.client.mget([f"page-version:{name}" for name in names])
+        return [int(value or 0) for value in values]
+
+    def bump(self, names) -> None:
+        pipe = self.client.pipeline()
+        for name in names:
+            pipe.incr(f"page-version:{name}")
+        pipe.execute()
+
+
+_backend = None
+
+
+def get_page_cache():
+    global _backend
+    if _backend is None:
+        url = settings.PAGE_CACHE_URL
+        _backend = RedisPageCacheBackend(url) if url else LRUPageCacheBackend()
+    return _backend
+
+
+def set_page_cache_backend(backend) -> None:
+    global _backend
+    _backend = backend
+
+
+def _cacheable(request: Request) -> bool:
+    # flash toasts are rendered into the page from cookies
+    return not any(name.startswith("flash_") for name in request.cookies)
+
+
+def page_cache_key(request: Request, *scopes: str) -> str:
+    """
+    Route URL (host, path, sorted query), partial/full variant and the
+    current version of every scope the page depends on.
+    """
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    variant = "xhr" if request.headers.get("X-Requested-With") == "XMLHttpRequest" else "page"
+    versions = get_page_cache().versions(scopes)
+    stamp = ",".join(f"{scope}@{version}" for scope, version in zip(scopes, versions))
+
+    return f"{request.url.scheme}://{request.url.netloc}{request.url.path}?{query}|{variant}|{stamp}"
+
+
+def cached_page(request: Request, *scopes: str):
+    """
+    (key, response) on a hit, (key, None) on a miss; key is None when
+    the request must not use the cache. A hit whose stored ETag matches
+    If-None-Match is answered with a 304.
+    """
+    if not _cacheable(request):
+        return None, None
+
+    key = page_cache_key(request, *scopes)
+    entry = get_page_cache().get(key)
+    if entry is None:
+        return key, None
+
+    # stored as b"<etag>\n<body>", the ETag line is empty when there is none
+    etag, _, body = entry.partition(b"\n")
+    if not etag:
+        return key, HTMLResponse(body)
+
+    etag = etag.decode("ascii")
+    return key, not_modified(request, etag) or HTMLResponse(body, headers=validator_headers(etag))
+
+
+def store_page(key, response, ttl: int = PAGE_CACHE_TTL):
+    if key is not None and response.status_code == 200:
+        etag = response.headers.get("etag", "")
+        get_page_cache().set(key, etag.encode("ascii") + b"\n" + response.body, ttl)
+    return response
+
+
+def bump_page_versions(*scopes: str) -> None:
+    """
+    Invalidate every cached page depending on one of `scopes`
+    ("catalog", "package:<id>").
+    """
+    get_page_cache().bump(scopes)
@@ -0,0 +1,45 @@
+import threading
+import time
+from collections import OrderedDict
+
+RATE_LIMIT_MAX_KEYS = 10000
+
+
+class TokenBucketLimiter:
+    """
+    Token bucket per key (client IP, email, ...): up to `capacity` requests
+    in a burst, then one every `refill_seconds`. In-process, like the page
+    and principal caches; the least recently seen keys are dropped past
+    `max_keys`, which at worst hands an idle key a full bucket again.
+    """
+
+    def __init__(self, capacity: int, refill_seconds: float, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.capacity = capacity
+        self.refill_seconds = refill_seconds
+        self.max_keys = max_keys
+        # key -> (tokens, monotonic time of last update)
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str) -> float:
+        """
+        Take one token for `key`. Returns 0 when allowed, otherwise the
+        seconds until a token is available (for a Retry-After message).
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) / self.refill_seconds)
+
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0.0
+            else:
+                retry_after = (1 - tokens) * self.refill_seconds
+
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+        return retry_after
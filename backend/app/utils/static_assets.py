@@ -0,0 +1,179 @@
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+from pathlib import Path
+
+from jinja2 import pass_context
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import StaticFiles
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = Path("app/static")
+ASSETS_DIR = "assets"
+# fingerprinted copies, their .gz / .br siblings and manifest.json
+BUILD_DIR = STATIC_DIR / "build"
+MANIFEST_PATH = BUILD_DIR / "manifest.json"
+
+# woff / woff2 / images are compressed formats already
+COMPRESSIBLE_SUFFIXES = {".js", ".mjs", ".css", ".map", ".svg", ".json", ".txt", ".ttf", ".eot", ".ico"}
+FINGERPRINT_LENGTH = 12
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# preferred first
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+_manifest = None
+
+
+# =================================================
+# BUILD STEP
+# =================================================
+def fingerprinted_name(path: str, digest: str) -> str:
+    """
+    assets/plugins/jquery/jquery.min.js -> assets/plugins/jquery/jquery.min.<digest>.js
+    """
+    head, dot, suffix = path.rpartition(".")
+    if not dot or "/" in suffix:
+        return f"{path}.{digest}"
+    return f"{head}.{digest}.{suffix}"
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def build_static_assets(static_dir: Path = STATIC_DIR, build_dir: Path = BUILD_DIR) -> dict:
+    """
+    Copy every file under static/assets to build/ under a content-hashed
+    name, write .gz / .br siblings for compressible types and a manifest
+    {logical path: fingerprinted path}. Unchanged files are skipped, so
+    reruns only touch what changed.
+    """
+    import brotli
+
+    manifest = {}
+    written = 0
+
+    for source in sorted((static_dir / ASSETS_DIR).rglob("*")):
+        if not source.is_file():
+            continue
+
+        logical = source.relative_to(static_dir).as_posix()
+        data = source.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()[:FINGERPRINT_LENGTH]
+        hashed = fingerprinted_name(logical, digest)
+        manifest[logical] = hashed
+
+        target = build_dir / hashed
+        if target.exists():
+            continue
+
+        _write_atomic(target, data)
+        written += 1
+
+        if source.suffix.lower() in COMPRESSIBLE_SUFFIXES:
+            variants = {
+                ".gz": gzip.compress(data, compresslevel=9, mtime=0),
+                ".br": brotli.compress(data, quality=11),
+            }
+            for extension, compressed in variants.items():
+                # not worth a sibling when it does not shrink the file
+                if len(compressed) < len(data):
+                    _write_atomic(target.with_name(target.name + extension), compressed)
+
+    _write_atomic(
+        build_dir / MANIFEST_PATH.name,
+        json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"),
+    )
+    logger.info("Built %s static assets (%s new)", len(manifest), written)
+    return manifest
+
+
+# =================================================
+# MANIFEST / TEMPLATE HELPER
+# =================================================
+def asset_manifest() -> dict:
+    """
+    {logical path: fingerprinted path}, read once per process; empty
+    when the build step has not run (plain URLs are used then).
+    """
+    global _manifest
+    if _manifest is None:
+        try:
+            _manifest = json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            logger.warning("No static asset manifest at %s, serving unversioned assets", MANIFEST_PATH)
+            _manifest = {}
+    return _manifest
+
+
+@pass_context
+def asset_url(context, path: str) -> str:
+    """
+    {{ asset_url('assets/dist/css/adminlte.min.css') }} – URL of the
+    fingerprinted, long-cached copy of a static asset.
+    """
+    return str(context["request"].url_for("static", path=asset_manifest().get(path, path)))
+
+
+# =================================================
+# STATIC HANDLER
+# =================================================
+def accepted_encodings(accept_encoding: str) -> set:
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+class AssetStaticFiles(StaticFiles):
+    """
+    StaticFiles that answers fingerprinted asset URLs from the build
+    directory: precompressed variant by Accept-Encoding, cached forever.
+    Anything else (uploads, unversioned paths) is served as before.
+    """
+
+    def __init__(self, *args, build_directory: Path = BUILD_DIR, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.build_directory = Path(build_directory)
+        self._fingerprinted = None
+
+    def fingerprinted(self) -> set:
+        if self._fingerprinted is None:
+            self._fingerprinted = set(asset_manifest().values())
+        return self._fingerprinted
+
+    async def get_response(self, path: str, scope):
+        hashed = path.replace(os.sep, "/")
+        if hashed not in self.fingerprinted():
+            return await super().get_response(path, scope)
+
+        file_path = self.build_directory / hashed
+        headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+        media_type = mimetypes.guess_type(hashed)[0] or "application/octet-stream"
+
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        for encoding, extension in ENCODINGS:
+            variant = file_path.with_name(file_path.name + extension)
+            if encoding in accepted and variant.is_file():
+                headers["Content-Encoding"] = encoding
+                return FileResponse(variant, headers=headers, media_type=media_type)
+
+        return FileResponse(file_path, headers=headers, media_type=media_type)
@@ -0,0 +1,133 @@
+import os
+
+# app.database.session builds its engine at import: point it at the test
+# database, never at the DATABASE_URL from .env
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL") or "postgresql://localhost/unused"
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401 (registers every table on Base.metadata)
+from app.auth.dependencies import company_only
+from app.auth.principal_cache import CompanyPrincipal, Principal
+from app.database.base import Base
+from app.database.session import get_db
+from app.main import app
+from app.models.company import Company
+from app.models.driver import Driver
+from app.models.tour_package import TourPackage, TourPackageDriver
+from app.models.user import User
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+@pytest.fixture(scope="session")
+def pg_engine():
+    """
+    Schema on a throwaway PostgreSQL database (TEST_DATABASE_URL, e.g.
+    postgresql://postgres@localhost/tour_test); skipped when unset.
+    """
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL not set")
+
+    engine = create_engine(TEST_DATABASE_URL, pool_size=20, max_overflow=20)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    yield engine
+
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def pg_session(pg_engine):
+    """
+    Session factory over empty tables.
+    """
+    tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+    with pg_engine.begin() as conn:
+        conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+    return sessionmaker(bind=pg_engine)
+
+
+@pytest.fixture
+def db(pg_session):
+    """
+    One session, closed (and rolled back) even when the test fails, so it
+    never holds locks the next test's TRUNCATE would wait on.
+    """
+    session = pg_session()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def company(pg_session):
+    """
+    A company with one tour package served by two drivers.
+    """
+    db = pg_session()
+    user = User(email="company@example.com", password_hash="x", role="company")
+    db.add(user)
+    db.flush()
+
+    company = Company(user_id=user.id, company_name="Acme Tours", currency="AED", status="active")
+    db.add(company)
+    db.flush()
+
+    package = TourPackage(
+        company_id=company.id, title="Desert Safari", description="Dunes",
+        country="UAE", city="Dubai", price=100, currency="AED",
+    )
+    drivers = [
+        Driver(company_id=company.id, name=f"Driver {i}", phone_number=f"50000000{i}", seats=6)
+        for i in (1, 2)
+    ]
+    db.add(package)
+    db.add_all(drivers)
+    db.flush()
+    db.add_all(TourPackageDriver(tour_package_id=package.id, driver_id=driver.id) for driver in drivers)
+    db.commit()
+
+    ids = {
+        "user": user.id,
+        "company": company.id,
+        "package": package.id,
+        "drivers": [driver.id for driver in drivers],
+    }
+    db.close()
+    return ids
+
+
+@pytest.fixture
+def client(pg_session):
+    """
+    TestClient on the test database (not logged in).
+    """
+    def test_db():
+        db = pg_session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = test_db
+
+    yield TestClient(app)
+
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def company_client(client, company):
+    """
+    TestClient logged in as `company`, on the test database.
+    """
+    principal = Principal(company["user"], "company", CompanyPrincipal(company["company"], "active", "AED"))
+    app.dependency_overrides[company_only] = lambda: principal
+    return client
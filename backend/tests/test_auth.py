@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+from passlib.hash import bcrypt
+from sqlalchemy.orm import Session
+
+from app.core.security import BCRYPT_ROUNDS, create_reset_token
+from app.models.user import User
+
+PASSWORD = "s3cret-password"
+
+
+@pytest.fixture
+def queries_on_event_loop(monkeypatch):
+    """
+    Statements executed while an event loop runs in the same thread.
+    """
+    on_loop = []
+    execute = Session.execute
+
+    def checked_execute(self, *args, **kwargs):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(str(args[0]))
+        except RuntimeError:
+            pass
+        return execute(self, *args, **kwargs)
+
+    monkeypatch.setattr(Session, "execute", checked_execute)
+    return on_loop
+
+
+def stored_hash(db, user_id):
+    db.rollback()
+    return db.get(User, user_id).password_hash
+
+
+def test_login_rehashes_outdated_hash_off_the_event_loop(client, company, db, queries_on_event_loop):
+    old_hash = bcrypt.using(rounds=4).hash(PASSWORD)
+    db.get(User, company["user"]).password_hash = old_hash
+    db.commit()
+
+    response = client.post(
+        "/auth/login",
+        data={"email": "company@example.com", "password": PASSWORD},
+        follow_redirects=False,
+    )
+
+    assert response.status_code == 302
+    assert response.cookies["user_role"] == "company"
+    new_hash = stored_hash(db, company["user"])
+    assert new_hash != old_hash and bcrypt.from_string(new_hash).rounds == BCRYPT_ROUNDS
+    assert queries_on_event_loop == []
+
+
+def test_reset_password_saves_new_hash_off_the_event_loop(client, company, db, queries_on_event_loop):
+    response = client.post(
+        "/auth/reset-password",
+        data={
+            "token": create_reset_token(company["user"]),
+            "password": PASSWORD,
+            "confirm_password": PASSWORD,
+        },
+        follow_redirects=False,
+    )
+
+    assert response.status_code == 303
+    assert bcrypt.verify(PASSWORD, stored_hash(db, company["user"]))
+    assert queries_on_event_loop == []
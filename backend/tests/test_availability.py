@@ -0,0 +1,46 @@
+from datetime import date
+
+from app.models.manual_booking import ManualBooking
+from app.models.tour_package import TourPackage
+from app.services.availability_service import seat_availability
+
+WINDOW = (date(2026, 12, 1), date(2026, 12, 8))
+
+
+def add_booking(db, company, package_id, day, driver_id=None):
+    db.add(ManualBooking(
+        company_id=company["company"], tour_package_id=package_id, driver_id=driver_id,
+        travel_date=day, adults=2, kids=0, total_amount=100, advance_amount=0,
+        remaining_amount=100, payment_status="pending",
+    ))
+
+
+def full_dates(db, company, package_id, pax=0):
+    seats = seat_availability(db, company["company"], package_id, *WINDOW)
+    return [seats.day(i) for i in seats.full_days(pax).tolist()]
+
+
+def test_package_without_drivers_blocks_only_booked_days(db, company):
+    package = TourPackage(
+        company_id=company["company"], title="Walking Tour", description="Old town",
+        country="UAE", city="Dubai", price=50, currency="AED",
+    )
+    db.add(package)
+    db.flush()
+    add_booking(db, company, package.id, date(2026, 12, 3))
+    db.commit()
+
+    assert full_dates(db, company, package.id) == [date(2026, 12, 3)]
+    assert full_dates(db, company, package.id, pax=4) == [date(2026, 12, 3)]
+
+
+def test_day_is_full_once_every_package_driver_is_taken(db, company):
+    first, second = company["drivers"]
+    add_booking(db, company, company["package"], date(2026, 12, 2), first)
+    add_booking(db, company, company["package"], date(2026, 12, 4), first)
+    add_booking(db, company, company["package"], date(2026, 12, 4), second)
+    # waiting for a driver: takes the last free one
+    add_booking(db, company, company["package"], date(2026, 12, 2))
+    db.commit()
+
+    assert full_dates(db, company, company["package"]) == [date(2026, 12, 2), date(2026, 12, 4)]
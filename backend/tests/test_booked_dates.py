@@ -0,0 +1,21 @@
+from datetime import date, time
+
+from app.models.manual_booking import ManualBooking
+
+
+def test_booked_dates_serialises_travel_time_and_revalidates(company_client, company, db):
+    db.add(ManualBooking(
+        company_id=company["company"], tour_package_id=company["package"], driver_id=company["drivers"][0],
+        travel_date=date(2026, 12, 3), travel_time=time(9, 30), adults=2, kids=0,
+        total_amount=100, advance_amount=0, remaining_amount=100, payment_status="pending",
+    ))
+    db.commit()
+
+    url = f"/manual-bookings/booked-dates/{company['package']}?from=2026-12-01&to=2026-12-08"
+    response = company_client.get(url)
+
+    assert response.status_code == 200
+    assert [booking["travel_time"] for booking in response.json()["bookings"]] == ["09:30:00"]
+
+    again = company_client.get(url, headers={"If-None-Match": response.headers["etag"]})
+    assert again.status_code == 304
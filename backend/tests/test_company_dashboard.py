@@ -0,0 +1,64 @@
+from datetime import date
+
+import pytest
+
+from app.auth.dependencies import get_current_user
+from app.auth.principal_cache import CompanyPrincipal, Principal
+from app.main import app
+from app.models.booking_daily_stats import BookingDailyStats
+from app.models.company import Company
+from app.models.user import User
+
+
+@pytest.fixture
+def client_as(client):
+    """
+    Log `client` in as the given principal.
+    """
+    def login(principal):
+        app.dependency_overrides[get_current_user] = lambda: principal
+        return client
+
+    return login
+
+
+@pytest.fixture
+def two_companies(db, company):
+    owner = User(email="other@example.com", password_hash="x", role="company")
+    db.add(owner)
+    db.flush()
+    other = Company(user_id=owner.id, company_name="Other Tours", currency="USD", status="active")
+    db.add(other)
+    db.flush()
+    today = date.today()
+    db.add_all([
+        BookingDailyStats(company_id=company["company"], day=today, tour_package_id=company["package"],
+                          booking_count=2, pending_count=1, total_amount=200),
+        BookingDailyStats(company_id=other.id, day=today, tour_package_id=company["package"],
+                          booking_count=3, pending_count=0, total_amount=300),
+    ])
+    db.commit()
+    return company
+
+
+def test_company_sees_its_own_totals(client_as, two_companies):
+    company = two_companies
+    client = client_as(Principal(company["user"], "company", CompanyPrincipal(company["company"], "active", "AED")))
+
+    overview = client.get("/company/dashboard/overview").json()
+
+    assert overview["currency"] == "AED"
+    assert overview["yearly_bookings"] == 2
+    assert overview["summary"] == {"total_bookings": 2, "pending_payments": 1, "total_revenue": 200.0}
+
+
+def test_admin_without_company_sees_every_company(client_as, two_companies):
+    client = client_as(Principal(two_companies["user"], "admin", None))
+
+    for path in ("/company/dashboard/summary", "/company/dashboard/dashboard-stats", "/company/dashboard/overview"):
+        assert client.get(path).status_code == 200
+
+    overview = client.get("/company/dashboard/overview").json()
+    assert overview["currency"] == "USD"
+    assert overview["yearly_bookings"] == 5
+    assert overview["summary"] == {"total_bookings": 5, "pending_payments": 1, "total_revenue": 500.0}
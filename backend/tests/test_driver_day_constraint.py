@@ -0,0 +1,101 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+
+from app.models.booking_daily_stats import BookingDailyStats
+from app.models.manual_booking import ManualBooking
+
+CONCURRENT_REQUESTS = 16
+TRAVEL_DATE = "2026-12-01"
+
+
+def booking_form(company, **fields):
+    form = {
+        "guest_name": "Guest",
+        "country_code": "+971",
+        "phone": "501234567",
+        "adults": 2,
+        "kids": 0,
+        "tour_package_id": company["package"],
+        "driver_id": company["drivers"][0],
+        "travel_date": TRAVEL_DATE,
+        "total_amount": 100,
+        "advance_amount": 0,
+    }
+    form.update(fields)
+    return form
+
+
+def post_concurrently(client, url_and_forms):
+    """
+    POST every (url, form) at the same moment; returns the responses.
+    """
+    barrier = Barrier(len(url_and_forms))
+
+    def post(url_and_form):
+        url, form = url_and_form
+        barrier.wait()
+        return client.post(url, data=form, follow_redirects=False)
+
+    with ThreadPoolExecutor(max_workers=len(url_and_forms)) as pool:
+        return list(pool.map(post, url_and_forms))
+
+
+def is_conflict(response):
+    return response.status_code == 303 and "already booked" in response.cookies.get("flash_error", "")
+
+
+def live_bookings(db, driver_id):
+    db.rollback()  # fresh snapshot
+    return (
+        db.query(ManualBooking)
+        .filter(
+            ManualBooking.driver_id == driver_id,
+            ManualBooking.travel_date == TRAVEL_DATE,
+            ManualBooking.is_deleted == False,
+        )
+        .count()
+    )
+
+
+def test_concurrent_creates_book_a_driver_once_per_day(company_client, company, db):
+    requests = [
+        ("/manual-bookings/create", booking_form(company, phone=f"5012345{i:02d}"))
+        for i in range(CONCURRENT_REQUESTS)
+    ]
+    responses = post_concurrently(company_client, requests)
+
+    created = [r for r in responses if r.status_code == 303 and r.headers["location"].endswith("/manual-bookings/")]
+    conflicts = [r for r in responses if is_conflict(r)]
+    assert len(created) == 1
+    assert len(conflicts) == CONCURRENT_REQUESTS - 1
+    assert live_bookings(db, company["drivers"][0]) == 1
+
+    # rolled-back attempts leave no trace in the rollup
+    assert sum(row.booking_count for row in db.query(BookingDailyStats)) == 1
+
+
+def test_concurrent_updates_onto_a_booked_day_are_rejected(company_client, company, db):
+    driver_id = company["drivers"][0]
+    # one booking per day on other dates, all with the same driver
+    for day in range(2, 2 + CONCURRENT_REQUESTS):
+        response = company_client.post(
+            "/manual-bookings/create",
+            data=booking_form(company, travel_date=f"2026-12-{day:02d}", phone=f"5099999{day:02d}"),
+            follow_redirects=False,
+        )
+        assert response.status_code == 303 and not is_conflict(response)
+
+    booking_ids = [booking.id for booking in db.query(ManualBooking).order_by(ManualBooking.id)]
+    db.rollback()
+
+    # every one of them moved onto the same day at once
+    requests = [
+        (f"/manual-bookings/{booking_id}/update", booking_form(company, phone=f"5099999{i + 2:02d}"))
+        for i, booking_id in enumerate(booking_ids)
+    ]
+    responses = post_concurrently(company_client, requests)
+
+    assert sum(1 for r in responses if is_conflict(r)) == CONCURRENT_REQUESTS - 1
+    assert all(r.status_code == 303 for r in responses)
+    assert live_bookings(db, driver_id) == 1
+    assert sum(row.booking_count for row in db.query(BookingDailyStats)) == CONCURRENT_REQUESTS
@@ -0,0 +1,26 @@
+import socket
+
+import pytest
+
+pytest.importorskip("aiosmtpd")
+
+from app.seeds.benchmark_email_delivery import benchmark  # noqa: E402
+
+MESSAGES = 40
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_pooled_delivery_beats_a_connection_per_message():
+    results = benchmark(MESSAGES, connections=2, handshake_ms=20, message_ms=0, port=free_port())
+    print({mode: f"{result['msgs_per_s']:.0f} msgs/s" for mode, result in results.items()})
+
+    per_message, pooled = results["per-message"], results["pooled"]
+    assert per_message["received"] == pooled["received"] == MESSAGES
+    assert per_message["sessions"] == MESSAGES
+    assert pooled["sessions"] <= 2
+    assert pooled["msgs_per_s"] > per_message["msgs_per_s"]
@@ -0,0 +1,60 @@
+import re
+
+from app.models.tour_package import TourPackage
+from app.routers.web.tour_package import PUBLIC_TOURS_PER_PAGE
+
+# a date nobody booked: results are the same, and the page cache is skipped
+TRAVEL_DATE = "2030-01-01"
+
+
+def add_packages(db, company, title, count):
+    packages = [
+        TourPackage(
+            company_id=company["company"], title=title, description="Dunes and camels",
+            country="UAE", city="Dubai", price=100, currency="AED", status="active",
+        )
+        for _ in range(count)
+    ]
+    db.add_all(packages)
+    db.commit()
+    return [package.id for package in packages]
+
+
+def search_pages(client, term):
+    """
+    Tour ids of every page, following the cursors.
+    """
+    pages, cursor = [], ""
+    for _ in range(10):  # a cursor that repeats a page would loop forever
+        response = client.get(
+            "/tour-packages/tours",
+            params={"search": term, "travel_date": TRAVEL_DATE, "cursor": cursor},
+            headers={"X-Requested-With": "XMLHttpRequest"},
+        )
+        assert response.status_code == 200
+        pages.append([int(tour_id) for tour_id in re.findall(r"/tours/(\d+)\"", response.text)])
+        cursor = re.search(r'data-next-cursor="([^"]*)"', response.text).group(1)
+        if not cursor:
+            break
+    return pages
+
+
+def test_search_pages_through_tied_ranks_without_repeats_or_gaps(client, company, db):
+    # a few better matches, then more equally ranked ones (with the
+    # fixture's "Desert Safari") than fit on a page
+    best = add_packages(db, company, "Safari safari desert safari", 5)
+    tied = add_packages(db, company, "Desert safari", PUBLIC_TOURS_PER_PAGE + 5) + [company["package"]]
+
+    pages = search_pages(client, "safari")
+
+    assert [len(page) for page in pages] == [PUBLIC_TOURS_PER_PAGE, 11]
+    assert sum(pages, []) == sorted(best, reverse=True) + sorted(tied, reverse=True)
+
+
+def test_garbage_cursor_starts_from_the_first_page(client, company, db):
+    add_packages(db, company, "Desert safari", 3)  # and the fixture's package
+
+    for cursor in ("nan_5", "x_y", "1e999999999_3"):
+        response = client.get("/tour-packages/tours", params={"search": "safari", "travel_date": TRAVEL_DATE, "cursor": cursor})
+        assert response.status_code == 200
+        assert len(re.findall(r"/tours/(\d+)\"", response.text)) == 4
@@ -0,0 +1,94 @@
+import io
+import os
+import time
+
+import pytest
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+from app.models.driver import Driver
+from app.services import upload_gc_service
+from app.services.upload_gc_service import collect_orphan_uploads
+from app.utils import file_upload
+from app.utils.file_upload import save_upload
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+TWO_HOURS_AGO = time.time() - 7200
+
+
+@pytest.fixture
+def static_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_upload, "STATIC_ROOT", str(tmp_path))
+    monkeypatch.setattr(upload_gc_service, "STATIC_ROOT", str(tmp_path))
+    return tmp_path
+
+
+def upload(content=PNG):
+    return save_upload(
+        UploadFile(file=io.BytesIO(content), filename="photo.png", headers=Headers({"content-type": "image/png"})),
+        "driver_image",
+    )
+
+
+def old_blob(static_root, content=PNG):
+    """
+    An uploaded blob plus a resized copy, both past the grace period.
+    """
+    path = upload(content)
+    variant = path.replace(".png", ".thumb.webp")
+    (static_root / variant).write_bytes(b"RIFF")
+    for relpath in (path, variant):
+        os.utime(static_root / relpath, (TWO_HOURS_AGO, TWO_HOURS_AGO))
+    return path, variant
+
+
+def add_driver(db, company, image):
+    db.add(Driver(company_id=company["company"], name="New", phone_number="509999999", seats=4, image=image))
+    db.commit()
+
+
+def run_gc(db, before_delete=None, monkeypatch=None):
+    if before_delete:
+        delete_batch = upload_gc_service._delete_batch
+
+        def racing_delete_batch(*args):
+            before_delete()
+            return delete_batch(*args)
+
+        monkeypatch.setattr(upload_gc_service, "_delete_batch", racing_delete_batch)
+    return collect_orphan_uploads(db)
+
+
+def test_orphaned_blob_and_variants_are_deleted(db, company, static_root):
+    path, variant = old_blob(static_root)
+    kept, _ = old_blob(static_root, PNG + b"kept")
+    add_driver(db, company, kept)
+
+    stats = run_gc(db)
+
+    assert not (static_root / path).exists() and not (static_root / variant).exists()
+    assert (static_root / kept).exists()
+    assert (stats["deleted"], stats["referenced"]) == (2, 2)
+
+
+def test_blob_reused_by_an_upload_during_gc_is_kept(db, company, static_root, monkeypatch):
+    path, variant = old_blob(static_root)
+
+    def reupload_same_content():
+        # dedup hit between the scan and the delete: touches the blob,
+        # then the new row commits
+        add_driver(db, company, upload())
+
+    stats = run_gc(db, reupload_same_content, monkeypatch)
+
+    assert (static_root / path).exists() and (static_root / variant).exists()
+    assert stats["deleted"] == 0
+
+
+def test_blob_referenced_by_a_row_committed_during_gc_is_kept(db, company, static_root, monkeypatch):
+    path, variant = old_blob(static_root)
+
+    stats = run_gc(db, lambda: add_driver(db, company, path), monkeypatch)
+
+    assert (static_root / path).exists() and (static_root / variant).exists()
+    assert (stats["deleted"], stats["referenced"]) == (0, 2)
@@ -0,0 +1,115 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from app.models.whatsapp_outbox import WhatsAppOutbox, OUTBOX_FAILED, OUTBOX_PENDING, OUTBOX_SENDING, OUTBOX_SENT
+from app.services import whatsapp_outbox_service
+from app.services.whatsapp_outbox_service import OUTBOX_MAX_ATTEMPTS, drain_outbox, whatsapp_client
+
+# recipient -> how the mocked Graph API answers
+RESPONSES = {
+    "971500000001": httpx.Response(200, json={"messages": [{"id": "wamid.1"}]}),
+    "971500000002": httpx.Response(429, json={"error": {"message": "rate limited"}}),
+    "971500000003": httpx.Response(503, text="unavailable"),
+    "971500000004": httpx.Response(400, json={"error": {"message": "invalid number"}}),
+}
+UNREACHABLE = "971500000005"
+
+
+def graph_api(request: httpx.Request) -> httpx.Response:
+    assert request.url.path == "/v18.0/123456/messages"
+    assert request.headers["authorization"] == "Bearer test-token"
+    recipient = json.loads(request.content)["to"]
+    if recipient == UNREACHABLE:
+        raise httpx.ConnectError("connection refused", request=request)
+    return RESPONSES[recipient]
+
+
+@pytest.fixture
+def outbox(pg_session, company, monkeypatch):
+    monkeypatch.setattr(whatsapp_outbox_service, "SessionLocal", pg_session)
+    monkeypatch.setenv("WHATSAPP_ACCESS_TOKEN", "test-token")
+    monkeypatch.setenv("WHATSAPP_PHONE_NUMBER_ID", "123456")
+
+    def add(to_phone, **fields):
+        db = pg_session()
+        try:
+            row = WhatsAppOutbox(
+                company_id=company["company"], template="booking_confirmation", to_phone=to_phone,
+                payload={"messaging_product": "whatsapp", "to": to_phone, "type": "template"},
+                **fields,
+            )
+            db.add(row)
+            db.commit()
+            return row.id
+        finally:
+            db.close()
+
+    return add
+
+
+def drain():
+    async def run():
+        async with whatsapp_client("https://graph.test/v18.0", transport=httpx.MockTransport(graph_api)) as client:
+            return await drain_outbox(client)
+
+    return asyncio.run(run())
+
+
+def outbox_rows(db):
+    db.rollback()
+    return {row.to_phone: row for row in db.query(WhatsAppOutbox)}
+
+
+def test_drain_records_sent_retry_and_failed(outbox, db):
+    for to_phone in [*RESPONSES, UNREACHABLE]:
+        outbox(to_phone)
+
+    assert drain() == 5
+
+    rows = outbox_rows(db)
+    now = datetime.now(timezone.utc)
+    sent = rows["971500000001"]
+    assert (sent.status, sent.provider_message_id, sent.attempts) == (OUTBOX_SENT, "wamid.1", 1)
+    assert sent.sent_at is not None
+
+    # throttled, Meta-side errors and network errors come back later
+    for to_phone in ("971500000002", "971500000003", UNREACHABLE):
+        row = rows[to_phone]
+        assert (row.status, row.attempts) == (OUTBOX_PENDING, 1)
+        assert now < row.next_attempt_at < now + timedelta(seconds=10)
+    assert rows["971500000002"].last_error.startswith("HTTP 429")
+    assert rows[UNREACHABLE].last_error.startswith("ConnectError")
+
+    failed = rows["971500000004"]
+    assert failed.status == OUTBOX_FAILED and failed.last_error.startswith("HTTP 400")
+
+    # nothing is due until the backoff has passed
+    assert drain() == 0
+
+
+def test_retry_on_last_attempt_fails_the_message(outbox, db):
+    outbox("971500000003", attempts=OUTBOX_MAX_ATTEMPTS - 1)
+
+    assert drain() == 1
+
+    row = outbox_rows(db)["971500000003"]
+    assert (row.status, row.attempts) == (OUTBOX_FAILED, OUTBOX_MAX_ATTEMPTS)
+
+
+def test_expired_claim_on_last_attempt_is_failed_not_resent(outbox, db):
+    expired = datetime.now(timezone.utc) - timedelta(seconds=1)
+    outbox("971500000001", status=OUTBOX_SENDING, attempts=OUTBOX_MAX_ATTEMPTS, next_attempt_at=expired)
+    outbox("971500000002", status=OUTBOX_SENDING, attempts=1, next_attempt_at=expired)
+
+    assert drain() == 1
+
+    rows = outbox_rows(db)
+    exhausted = rows["971500000001"]
+    assert (exhausted.status, exhausted.attempts) == (OUTBOX_FAILED, OUTBOX_MAX_ATTEMPTS)
+    assert exhausted.provider_message_id is None
+    # an expired claim with attempts left is simply retried
+    assert (rows["971500000002"].status, rows["971500000002"].attempts) == (OUTBOX_PENDING, 2)